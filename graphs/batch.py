@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+import numpy as np
+from csr import CSRGraph, as_csr
+from paths import dijkstra_csr
+
+# sources per task: big enough to amortise the round trip, small enough to balance the cores
+CHUNK_SIZE = 16
+# tasks kept in flight per worker, so thousands of sources never sit in the queue at once
+TASKS_PER_WORKER = 4
+CSR_ARRAYS = ('indptr', 'indices', 'weights')
+
+# set in every worker by init_worker
+_blocks = []
+_graph = None
+_output = None
+
+
+def share_graph(graph):
+    # copy the CSR arrays into shared memory once; workers map them read-only
+    # instead of unpickling the graph per task
+    blocks, spec = [], {}
+    try:
+        for name in CSR_ARRAYS:
+            array = getattr(graph, name)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[:] = array
+            spec[name] = (block.name, array.dtype.str, array.shape)
+    except BaseException:
+        release(blocks)
+        raise
+    return blocks, spec
+
+def attach_graph(spec):
+    blocks, arrays = [], {}
+    for name in CSR_ARRAYS:
+        block_name, dtype, shape = spec[name]
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        array = np.ndarray(shape, dtype, buffer=block.buf)
+        array.flags.writeable = False
+        arrays[name] = array
+    # workers only see node ids, labels stay in the parent
+    graph = CSRGraph(range(len(arrays['indptr']) - 1), arrays['indptr'], arrays['indices'], arrays['weights'])
+    return blocks, graph
+
+def release(blocks, unlink=True):
+    for block in blocks:
+        block.close()
+        if unlink:
+            block.unlink()
+
+def init_worker(spec, output_path):
+    global _blocks, _graph, _output
+    _blocks, _graph = attach_graph(spec)
+    _output = np.load(output_path, mmap_mode='r+')
+
+def solve_rows(rows, sources):
+    # rows go straight into the shared output file, only the row numbers travel back;
+    # the mapping is shared, so the parent sees them without a flush here
+    for row, source in zip(rows, sources):
+        _output[row] = dijkstra_csr(_graph, source).dist
+    return rows
+
+def open_output(output_path, num_sources, num_nodes):
+    return np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float64, shape=(num_sources, num_nodes))
+
+def iter_sssp(graph, sources, output_path, workers=None, chunk_size=CHUNK_SIZE):
+    # Yields (source, distance row) as rows finish, in completion order. Row i of
+    # the .npy matrix at output_path holds the distances from sources[i] to every
+    # node id (inf if unreachable); rows are views into that file, not copies.
+    graph = as_csr(graph)
+    ids = [graph.id_of(source) for source in sources]
+    output = open_output(output_path, len(ids), graph.num_nodes)
+    output.flush()
+    chunks = [list(range(i, min(i + chunk_size, len(ids)))) for i in range(0, len(ids), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for rows in chunks:
+            for row in rows:
+                output[row] = dijkstra_csr(graph, ids[row]).dist
+                yield sources[row], output[row]
+        output.flush()
+        return
+
+    blocks, spec = share_graph(graph)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(spec, output_path)) as pool:
+            pending, remaining = set(), iter(chunks)
+            while True:
+                for rows in remaining:
+                    pending.add(pool.submit(solve_rows, rows, [ids[row] for row in rows]))
+                    if len(pending) >= workers * TASKS_PER_WORKER:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for row in future.result():
+                        yield sources[row], output[row]
+        # one write-back for the whole table once every worker is done
+        output.flush()
+    finally:
+        release(blocks)
+
+def batch_sssp(graph, sources, output_path, workers=None, chunk_size=CHUNK_SIZE):
+    # Distance table from every source to every node id, as a memory-mapped
+    # (len(sources), num_nodes) float64 matrix stored at output_path
+    for _ in iter_sssp(graph, sources, output_path, workers, chunk_size):
+        pass
+    return np.load(output_path, mmap_mode='r')
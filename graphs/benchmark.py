@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import numpy as np
+from batch import batch_sssp
+from ch import ContractionHierarchy
+from csr import CSRGraph
+from paths import dijkstra_csr
+from query import shortest_path
+from queues import choose_queue, dijkstra_queue
+
+# Offline benchmark for the graph code on large synthetic graphs; every mode
+# checks its answers against a full Dijkstra run and writes its rows as JSON.
+
+MODES = ('queries', 'batch', 'ch', 'queues')
+WEIGHT_RANGES = (1, 10, 100, 10000)
+MAX_WEIGHT = 10
+
+
+def grid_graph(side, rng, max_weight=MAX_WEIGHT):
+    # side x side grid, edges both ways between 4-neighbours with independent
+    # random weights; labels are (row, col), so Manhattan distance is admissible
+    labels = [(r, c) for r in range(side) for c in range(side)]
+    ids = np.arange(side * side).reshape(side, side)
+    pairs = [(ids[:, :-1], ids[:, 1:]), (ids[:-1, :], ids[1:, :])]
+    sources = np.concatenate([a.ravel() for a, b in pairs] + [b.ravel() for a, b in pairs])
+    targets = np.concatenate([b.ravel() for a, b in pairs] + [a.ravel() for a, b in pairs])
+    weights = rng.integers(1, max_weight + 1, len(sources))
+    return CSRGraph.from_edges(labels, sources, targets, weights)
+
+def manhattan(target):
+    return lambda node: abs(node[0] - target[0]) + abs(node[1] - target[1])
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def query_benchmark(graph, pairs):
+    # settled nodes and time per query for a full Dijkstra and each query method
+    totals = {name: {'settled': 0, 'seconds': 0.0} for name in ('full', 'dijkstra', 'bidirectional', 'astar')}
+    for start, end in pairs:
+        seconds, tree = timed(lambda: dijkstra_csr(graph, graph.id_of(start)))
+        expected = tree.distance(end)
+        totals['full']['settled'] += len(tree.order)
+        totals['full']['seconds'] += seconds
+
+        for method in ('dijkstra', 'bidirectional', 'astar'):
+            stats = {}
+            heuristic = manhattan(end) if method == 'astar' else None
+            seconds, (distance, path) = timed(lambda: shortest_path(graph, start, end, method, heuristic, stats))
+            if distance != expected or (path and path[0] != start) or (path and path[-1] != end):
+                raise AssertionError(f"{method} query {start!r} -> {end!r} gave {distance}, expected {expected}")
+            totals[method]['settled'] += stats['settled']
+            totals[method]['seconds'] += seconds
+
+    return [{
+        'mode': 'queries',
+        'method': name,
+        'nodes': graph.num_nodes,
+        'edges': graph.num_edges,
+        'queries': len(pairs),
+        'mean_settled': total['settled'] / len(pairs),
+        'mean_query_s': total['seconds'] / len(pairs),
+        'settled_vs_full': total['settled'] / totals['full']['settled'],
+    } for name, total in totals.items()]
+
+def batch_benchmark(graph, sources, worker_counts):
+    # wall time of the multi-process distance table per worker count; the
+    # single-process run is the baseline for speedup and for the answers
+    results, baseline = [], None
+    with tempfile.TemporaryDirectory() as workdir:
+        for workers in worker_counts:
+            output_path = os.path.join(workdir, f'dist-{workers}.npy')
+            seconds, table = timed(lambda: batch_sssp(graph, sources, output_path, workers))
+            if baseline is None:
+                baseline = (seconds, np.array(table))
+            elif not np.array_equal(table, baseline[1]):
+                raise AssertionError(f"batch table with {workers} workers differs")
+            results.append({
+                'mode': 'batch',
+                'workers': workers,
+                'nodes': graph.num_nodes,
+                'edges': graph.num_edges,
+                'sources': len(sources),
+                'wall_s': seconds,
+                'rows_per_s': len(sources) / seconds,
+                'speedup': baseline[0] / seconds,
+            })
+    return results
+
+def ch_benchmark(graph, pairs):
+    # one-off preprocessing cost and index size against per-query latency
+    preprocess_s, ch = timed(lambda: ContractionHierarchy.build(graph, cache_dir=None))
+    ch.query(*pairs[0])  # the query-side adjacency lists are built on first use
+    totals = {'ch': 0.0, 'dijkstra': 0.0, 'bidirectional': 0.0}
+    settled = {name: 0 for name in totals}
+    for start, end in pairs:
+        answers = {}
+        for name in totals:
+            stats = {}
+            if name == 'ch':
+                seconds, answers[name] = timed(lambda: ch.query(start, end, stats))
+            else:
+                seconds, answers[name] = timed(lambda: shortest_path(graph, start, end, name, stats=stats))
+            totals[name] += seconds
+            settled[name] += stats['settled']
+        distance, path = answers['ch']
+        ids = [graph.id_of(node) for node in path]
+        if distance != answers['dijkstra'][0] or sum(graph.weight(u, v) for u, v in zip(ids, ids[1:])) != (distance if path else 0):
+            raise AssertionError(f"CH query {start!r} -> {end!r} gave {distance}, expected {answers['dijkstra'][0]}")
+
+    return [{
+        'mode': 'ch',
+        'nodes': graph.num_nodes,
+        'edges': graph.num_edges,
+        'preprocess_s': preprocess_s,
+        'shortcuts': ch.num_shortcuts,
+        'index_bytes': ch.nbytes,
+        'queries': len(pairs),
+        **{f'{name}_query_ms': 1000 * total / len(pairs) for name, total in totals.items()},
+        **{f'{name}_settled': count / len(pairs) for name, count in settled.items()},
+    }]
+
+def random_graph(num_nodes, degree, max_weight, rng):
+    # uniform random directed multigraph, denser than the grid, so the heap sees many stale entries
+    num_edges = num_nodes * degree
+    return CSRGraph.from_edges(list(range(num_nodes)), rng.integers(0, num_nodes, num_edges),
+                               rng.integers(0, num_nodes, num_edges), rng.integers(0, max_weight + 1, num_edges))
+
+def queue_benchmark(graph, name, sources):
+    # full single-source runs per priority queue, all checked against the binary heap
+    results, expected = [], {}
+    for queue in ('heap', 'dial', 'radix'):
+        seconds = 0.0
+        for source in sources:
+            elapsed, tree = timed(lambda: dijkstra_queue(graph, source, queue))
+            seconds += elapsed
+            if queue == 'heap':
+                expected[source] = tree.dist
+            elif not np.array_equal(tree.dist, expected[source]):
+                raise AssertionError(f"{queue} queue gave different distances from {source}")
+        results.append({
+            'mode': 'queues',
+            'graph': name,
+            'queue': queue,
+            'auto': choose_queue(graph) == queue,
+            'nodes': graph.num_nodes,
+            'edges': graph.num_edges,
+            'max_weight': int(graph.weights.max()),
+            'mean_run_s': seconds / len(sources),
+        })
+    return results
+
+def random_pairs(graph, count, rng):
+    picks = rng.integers(0, graph.num_nodes, (count, 2))
+    return [(graph.labels[u], graph.labels[v]) for u, v in picks.tolist()]
+
+def run_benchmark(modes, sides, queries=20, sources=64, worker_counts=(1,), seed=0):
+    rng = np.random.default_rng(seed)
+    results = []
+    for side in sides:
+        graph = grid_graph(side, rng)
+        if 'queries' in modes:
+            for row in query_benchmark(graph, random_pairs(graph, queries, rng)):
+                results.append(row)
+                print(json.dumps(results[-1]))
+        if 'ch' in modes:
+            for row in ch_benchmark(graph, random_pairs(graph, queries, rng)):
+                results.append(row)
+                print(json.dumps(results[-1]))
+        if 'queues' in modes:
+            for max_weight in WEIGHT_RANGES:
+                for name, g in ((f'grid-{side}', grid_graph(side, rng, max_weight)),
+                                (f'random-{side * side}x8', random_graph(side * side, 8, max_weight, rng))):
+                    for row in queue_benchmark(g, name, rng.integers(0, g.num_nodes, 3).tolist()):
+                        results.append(row)
+                        print(json.dumps(results[-1]))
+        if 'batch' in modes:
+            picks = rng.choice(graph.num_nodes, min(sources, graph.num_nodes), replace=False)
+            for row in batch_benchmark(graph, [graph.labels[u] for u in picks.tolist()], worker_counts):
+                results.append(row)
+                print(json.dumps(results[-1]))
+    return results
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Shortest path benchmark on synthetic grid graphs.")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--sides', nargs='+', type=int, default=[100, 300], help="grid side length, nodes = side^2")
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--sources', type=int, default=64, help="sources per batch run")
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, os.cpu_count() or 1])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='graph_benchmark_results.json')
+    args = parser.parse_args()
+
+    report = {
+        'environment': environment(),
+        'settings': vars(args),
+        'results': run_benchmark(args.modes, args.sides, args.queries, args.sources,
+                                 args.workers, args.seed),
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
@@ -0,0 +1,262 @@
+import heapq
+import os
+import numpy as np
+from csr import CSRGraph, as_csr, label_array, load_arrays, save_arrays
+from oracle import CACHE_DIR
+
+INF = float('inf')
+# witness searches give up after this many settled nodes and add the shortcut anyway;
+# a few extra shortcuts cost far less than exhaustive searches
+WITNESS_SETTLE_LIMIT = 64
+ARRAYS = ('labels', 'rank', 'up_indptr', 'up_indices', 'up_weights', 'up_middle',
+          'down_indptr', 'down_indices', 'down_weights', 'down_middle')
+
+
+class _Contraction:
+    # working copy of the graph while nodes are removed one by one; every arc
+    # carries (weight, middle node) with middle -1 for an original edge
+    def __init__(self, graph, witness_limit):
+        self.witness_limit = witness_limit
+        self.out = [{} for _ in range(graph.num_nodes)]
+        self.inn = [{} for _ in range(graph.num_nodes)]
+        for u, v, w in zip(graph.edge_sources().tolist(), graph.indices.tolist(), graph.weights.tolist()):
+            if u != v and w < self.out[u].get(v, (INF,))[0]:
+                self.out[u][v] = self.inn[v][u] = (w, -1)
+        self.deleted = [0] * graph.num_nodes
+        self.up, self.down = [], []
+
+    def witness_distances(self, source, skip, limit, targets):
+        distances = {source: 0}
+        pq = [(0, source)]
+        remaining, settled = len(targets), 0
+        while pq and remaining and settled < self.witness_limit:
+            current_distance, current_node = heapq.heappop(pq)
+            if current_distance > distances[current_node]:
+                continue
+            settled += 1
+            remaining -= current_node in targets
+            for neighbor, (weight, _) in self.out[current_node].items():
+                distance = current_distance + weight
+                if distance <= limit and neighbor != skip and distance < distances.get(neighbor, INF):
+                    distances[neighbor] = distance
+                    heapq.heappush(pq, (distance, neighbor))
+        return distances
+
+    def shortcuts(self, v):
+        # u -> v -> w needs a shortcut unless some path around v is no longer
+        shortcuts = []
+        for u, (weight_in, _) in self.inn[v].items():
+            targets = {w: weight_in + weight_out for w, (weight_out, _) in self.out[v].items() if w != u}
+            if not targets:
+                continue
+            distances = self.witness_distances(u, v, max(targets.values()), targets)
+            shortcuts.extend((u, w, via) for w, via in targets.items() if distances.get(w, INF) > via)
+        return shortcuts
+
+    def priority(self, v, shortcuts):
+        # edge difference plus contracted neighbours, which spreads contraction evenly
+        return len(shortcuts) - len(self.inn[v]) - len(self.out[v]) + self.deleted[v]
+
+    def contract(self, v, shortcuts):
+        # arcs still attached to v are final: towards later (higher) nodes they belong
+        # to v's upward graph, from later nodes to v's downward graph
+        self.up.extend((v, w, weight, middle) for w, (weight, middle) in self.out[v].items())
+        self.down.extend((v, u, weight, middle) for u, (weight, middle) in self.inn[v].items())
+        for w in self.out[v]:
+            del self.inn[w][v]
+            self.deleted[w] += 1
+        for u in self.inn[v]:
+            del self.out[u][v]
+            self.deleted[u] += 1
+        self.out[v], self.inn[v] = {}, {}
+        for u, w, weight in shortcuts:
+            if weight < self.out[u].get(w, (INF,))[0]:
+                self.out[u][w] = self.inn[w][u] = (weight, v)
+
+def _csr_arrays(num_nodes, arcs, dtype):
+    sources, targets, weights, middles = (np.array(column) for column in zip(*arcs)) if arcs else ([],) * 4
+    sources = np.asarray(sources, dtype=np.int64)
+    order = np.argsort(sources, kind='stable')
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=num_nodes))))
+    return (indptr, np.asarray(targets, dtype=np.int64)[order], np.asarray(weights, dtype=dtype)[order],
+            np.asarray(middles, dtype=np.int64)[order])
+
+
+# Contraction hierarchy: nodes are ranked and contracted in that order, adding
+# shortcut arcs that keep distances between the remaining nodes. A query is a
+# bidirectional Dijkstra that only climbs the ranking (upward arcs from s, reversed
+# downward arcs from t); shortcuts remember the node they skip, to unpack paths.
+class ContractionHierarchy:
+    def __init__(self, labels, rank, up, up_middle, down, down_middle):
+        self.labels = labels
+        self.rank = rank
+        self.up = up
+        self.up_middle = up_middle
+        self.down = down
+        self.down_middle = down_middle
+        self._index = None
+        self._adjacency = None
+        self._middles = None
+
+    @classmethod
+    def build(cls, graph, witness_limit=WITNESS_SETTLE_LIMIT, cache_dir=CACHE_DIR):
+        graph = as_csr(graph)
+        cache_path = None
+        if cache_dir:
+            cache_path = os.path.join(cache_dir, f'ch{witness_limit}-' + graph.fingerprint())
+            if os.path.isdir(cache_path):
+                return cls.load(cache_path)
+
+        n = graph.num_nodes
+        state = _Contraction(graph, witness_limit)
+        pq = [(state.priority(v, state.shortcuts(v)), v) for v in range(n)]
+        heapq.heapify(pq)
+        rank = np.empty(n, dtype=np.int64)
+        contracted = 0
+        while pq:
+            # lazy updates: a node's priority is only recomputed when it reaches the top
+            _, v = heapq.heappop(pq)
+            shortcuts = state.shortcuts(v)
+            priority = state.priority(v, shortcuts)
+            if pq and priority > pq[0][0]:
+                heapq.heappush(pq, (priority, v))
+                continue
+            state.contract(v, shortcuts)
+            rank[v] = contracted
+            contracted += 1
+
+        up = _csr_arrays(n, state.up, graph.weights.dtype)
+        down = _csr_arrays(n, state.down, graph.weights.dtype)
+        ch = cls(graph.labels, rank, CSRGraph(graph.labels, *up[:3]), up[3],
+                 CSRGraph(graph.labels, *down[:3]), down[3])
+        ch._index = graph._index
+        if cache_path:
+            try:
+                ch.save(cache_path)
+            except OSError:
+                # an unwritable cache only means building the hierarchy again next time
+                pass
+        return ch
+
+    @classmethod
+    def load(cls, directory):
+        a = load_arrays(directory, ARRAYS)
+        up = CSRGraph(a['labels'], a['up_indptr'], a['up_indices'], a['up_weights'])
+        down = CSRGraph(a['labels'], a['down_indptr'], a['down_indices'], a['down_weights'])
+        return cls(a['labels'], a['rank'], up, a['up_middle'], down, a['down_middle'])
+
+    def arrays(self):
+        return {
+            'labels': label_array(self.labels), 'rank': self.rank,
+            'up_indptr': self.up.indptr, 'up_indices': self.up.indices,
+            'up_weights': self.up.weights, 'up_middle': self.up_middle,
+            'down_indptr': self.down.indptr, 'down_indices': self.down.indices,
+            'down_weights': self.down.weights, 'down_middle': self.down_middle,
+        }
+
+    def save(self, directory):
+        save_arrays(directory, self.arrays())
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays().values())
+
+    @property
+    def num_shortcuts(self):
+        return int(np.count_nonzero(self.up_middle >= 0) + np.count_nonzero(self.down_middle >= 0))
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {label: i for i, label in enumerate(self.labels)}
+        return self._index
+
+    def _lists(self):
+        # per-node (neighbour, weight, middle) lists for the query loop and an
+        # arc -> middle map for unpacking, built on the first query
+        if self._adjacency is None:
+            adjacency, self._middles = [], {}
+            for g, middles, upward in ((self.up, self.up_middle, True), (self.down, self.down_middle, False)):
+                bounds, targets = g.indptr.tolist(), g.indices.tolist()
+                weights, middles = g.weights.tolist(), middles.tolist()
+                adjacency.append([list(zip(targets[a:b], weights[a:b], middles[a:b]))
+                                  for a, b in zip(bounds, bounds[1:])])
+                sources = g.edge_sources().tolist()
+                arcs = zip(sources, targets) if upward else zip(targets, sources)
+                self._middles.update(zip(arcs, middles))
+            self._adjacency = adjacency
+        return self._adjacency
+
+    def _unpack(self, arcs):
+        # (from, to, middle) arcs in path order -> original node ids after the first
+        middles = self._middles
+        path = []
+        stack = list(reversed(arcs))
+        while stack:
+            a, b, middle = stack.pop()
+            if middle < 0:
+                path.append(b)
+                continue
+            stack.append((middle, b, middles[middle, b]))
+            stack.append((a, middle, middles[a, middle]))
+        return path
+
+    def query_ids(self, source, target, stats=None):
+        if source == target:
+            return 0, [source]
+        up, down = self._lists()
+        # forward search expands upward arcs, backward search the downward arcs reversed;
+        # a node is stalled (not expanded) when an arc from a higher node reaches it cheaper
+        searches = [(up, down, {source: 0}, {}, [(0, source)]), (down, up, {target: 0}, {}, [(0, target)])]
+        best, meeting, settled = INF, -1, 0
+
+        while True:
+            # each direction stops on its own once it can no longer improve the best meeting
+            for _, _, _, _, pq in searches:
+                if pq and pq[0][0] >= best:
+                    pq.clear()
+            forward_pq, backward_pq = searches[0][4], searches[1][4]
+            if not forward_pq and not backward_pq:
+                break
+            side = 0 if forward_pq and (not backward_pq or forward_pq[0][0] <= backward_pq[0][0]) else 1
+            expand, stall, dist, pred, pq = searches[side]
+            other = searches[1 - side][2]
+            current_distance, current_node = heapq.heappop(pq)
+            if current_distance > dist[current_node]:
+                continue
+            settled += 1
+            if current_node in other and current_distance + other[current_node] < best:
+                best, meeting = current_distance + other[current_node], current_node
+            if any(dist.get(higher, INF) + weight < current_distance for higher, weight, _ in stall[current_node]):
+                continue
+
+            for neighbor, weight, middle in expand[current_node]:
+                distance = current_distance + weight
+                if distance < dist.get(neighbor, INF):
+                    dist[neighbor] = distance
+                    pred[neighbor] = (current_node, middle)
+                    heapq.heappush(pq, (distance, neighbor))
+
+        if stats is not None:
+            stats['settled'] = settled
+        if meeting < 0:
+            return INF, []
+        forward, node = [], meeting
+        while node != source:
+            parent, middle = searches[0][3][node]
+            forward.append((parent, node, middle))
+            node = parent
+        forward.reverse()
+        backward, node = [], meeting
+        while node != target:
+            child, middle = searches[1][3][node]
+            backward.append((node, child, middle))
+            node = child
+        return best, [source] + self._unpack(forward + backward)
+
+    def query(self, start, end, stats=None):
+        # (distance, path) between two labels, as shortest_path(graph, start, end) returns
+        distance, path = self.query_ids(self.index[start], self.index[end], stats)
+        if self.up.integer_weights and path:
+            distance = int(distance)
+        return distance, [self.labels[node] for node in path]
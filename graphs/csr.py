@@ -0,0 +1,178 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import numpy as np
+
+
+# Compact directed graph: node labels interned to ids 0..n-1 and the outgoing
+# edges of node u stored in indices/weights[indptr[u]:indptr[u + 1]] (CSR).
+class CSRGraph:
+    def __init__(self, labels, indptr, indices, weights):
+        self.labels = labels
+        self.indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int64)
+        self.weights = np.ascontiguousarray(weights)
+        if self.weights.dtype.kind not in 'iuf':
+            self.weights = self.weights.astype(np.float64)
+        self._index = None
+        self._reverse = None
+
+    @classmethod
+    def from_dict(cls, graph):
+        labels = list(graph)
+        index = {label: i for i, label in enumerate(labels)}
+        # nodes that only appear as edge targets still get an id (and no outgoing edges)
+        for edges in graph.values():
+            for neighbor in edges:
+                if neighbor not in index:
+                    index[neighbor] = len(labels)
+                    labels.append(neighbor)
+
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        indices, weights = [], []
+        for node, edges in graph.items():
+            indptr[index[node] + 1] = len(edges)
+            indices.extend(index[neighbor] for neighbor in edges)
+            weights.extend(edges.values())
+        np.cumsum(indptr, out=indptr)
+        graph = cls(labels, indptr, indices, weights if weights else np.zeros(0))
+        graph._index = index
+        return graph
+
+    @classmethod
+    def from_edges(cls, labels, sources, targets, weights):
+        # edges in any order; the per-node order of the input is kept
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources, kind='stable')
+        counts = np.bincount(sources, minlength=len(labels))
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        return cls(labels, indptr, np.asarray(targets)[order], np.asarray(weights)[order])
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {label: i for i, label in enumerate(self.labels)}
+        return self._index
+
+    @property
+    def num_nodes(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @property
+    def integer_weights(self):
+        return self.weights.dtype.kind in 'iu'
+
+    def id_of(self, label):
+        return self.index[label]
+
+    def label_of(self, node_id):
+        return self.labels[node_id]
+
+    def neighbors(self, node_id):
+        start, end = self.indptr[node_id], self.indptr[node_id + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def weight(self, u, v):
+        targets, weights = self.neighbors(u)
+        hits = np.flatnonzero(targets == v)
+        if not hits.size:
+            raise KeyError((self.labels[u], self.labels[v]))
+        return weights[hits[0]].item()
+
+    def edge_sources(self):
+        return np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+
+    def reverse(self):
+        # same nodes with every edge flipped, built once and kept
+        if self._reverse is None:
+            self._reverse = CSRGraph.from_edges(self.labels, self.indices, self.edge_sources(), self.weights)
+            self._reverse._index = self._index
+            self._reverse._reverse = self
+        return self._reverse
+
+    def fingerprint(self):
+        # content hash of labels and edge arrays, used as a key for on-disk caches
+        digest = hashlib.sha256()
+        digest.update('\0'.join(map(str, self.labels)).encode())
+        for array in (self.indptr, self.indices, self.weights):
+            digest.update(array.dtype.str.encode())
+            digest.update(memoryview(array))
+        return digest.hexdigest()
+
+    def save(self, directory):
+        save_arrays(directory, {'labels': label_array(self.labels), 'indptr': self.indptr,
+                                'indices': self.indices, 'weights': self.weights})
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        # the arrays are memory-mapped, so reopening costs the same for any graph size
+        arrays = load_arrays(directory, ('labels', 'indptr', 'indices', 'weights'), mmap_mode)
+        return cls(arrays['labels'], arrays['indptr'], arrays['indices'], arrays['weights'])
+
+    def to_dict(self):
+        graph = {}
+        for u, label in enumerate(self.labels):
+            targets, weights = self.neighbors(u)
+            graph[label] = {self.labels[v]: w for v, w in zip(targets.tolist(), weights.tolist())}
+        return graph
+
+    def __repr__(self):
+        return f"CSRGraph(nodes={self.num_nodes}, edges={self.num_edges})"
+
+
+def label_array(labels):
+    # strings or numbers of a single type stay memory-mappable; anything else (tuples,
+    # mixed types, which np.asarray would coerce to strings) is pickled as objects
+    if isinstance(labels, np.ndarray) and labels.dtype != object:
+        return labels
+    if len({type(label) for label in labels}) == 1:
+        array = np.asarray(labels)
+        if array.ndim == 1 and array.dtype != object:
+            return array
+    return np.fromiter(labels, dtype=object, count=len(labels))
+
+def save_arrays(directory, arrays):
+    # one .npy file per array, written next to the target and renamed into place,
+    # so readers never see half a cache entry; an existing entry is moved aside
+    # first, since a directory cannot be renamed over another one
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent)
+    stale = None
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp, name + '.npy'), array, allow_pickle=array.dtype.hasobject)
+        if os.path.isdir(directory):
+            stale = tempfile.mkdtemp(dir=parent)
+            os.replace(directory, os.path.join(stale, 'entry'))
+        os.replace(tmp, directory)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        # another process may have put its entry in place first, which is as good
+        if not os.path.isdir(directory):
+            raise
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    finally:
+        if stale:
+            shutil.rmtree(stale, ignore_errors=True)
+
+def load_arrays(directory, names, mmap_mode='r'):
+    arrays = {}
+    for name in names:
+        filename = os.path.join(directory, name + '.npy')
+        try:
+            arrays[name] = np.load(filename, mmap_mode=mmap_mode)
+        except ValueError:
+            # pickled object arrays cannot be mapped
+            arrays[name] = np.load(filename, allow_pickle=True)
+    return arrays
+
+def as_csr(graph):
+    return graph if isinstance(graph, CSRGraph) else CSRGraph.from_dict(graph)
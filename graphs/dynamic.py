@@ -0,0 +1,168 @@
+import heapq
+import numpy as np
+from csr import CSRGraph
+from paths import ShortestPathTree
+
+INF = float('inf')
+
+
+# Single-source shortest paths kept up to date while edges change. Starts from a
+# dijkstra() result; every update repairs only the part of the tree it can affect
+# (Ramalingam-Reps) and returns the vertices whose distance or path changed.
+class DynamicSSSP:
+    def __init__(self, tree):
+        graph = tree.graph
+        self.labels = list(graph.labels)
+        self.index = dict(graph.index)
+        self.source = tree.source
+        self.integer_weights = graph.integer_weights
+        self.out = [{} for _ in range(graph.num_nodes)]
+        self.inn = [{} for _ in range(graph.num_nodes)]
+        for u, v, w in zip(graph.edge_sources().tolist(), graph.indices.tolist(), graph.weights.tolist()):
+            if w < self.out[u].get(v, INF):
+                self.out[u][v] = self.inn[v][u] = w
+        self.dist = tree.dist.tolist()
+        self.pred = tree.pred.tolist()
+
+    def _value(self, d):
+        return int(d) if self.integer_weights and d != INF else d
+
+    def distance(self, node):
+        return self._value(self.dist[self.index[node]])
+
+    def path_ids(self, target):
+        if self.dist[target] == INF:
+            return []
+        path = [target]
+        while self.pred[path[-1]] >= 0:
+            path.append(self.pred[path[-1]])
+        path.reverse()
+        return path
+
+    def path(self, node):
+        return [self.labels[i] for i in self.path_ids(self.index[node])]
+
+    def set_weight(self, u, v, weight):
+        # insert the edge u -> v or change its weight
+        if weight < 0:
+            raise ValueError(f"Edge weights must be non-negative, got {weight!r}.")
+        u, v = self.index[u], self.index[v]
+        old = self.out[u].get(v)
+        self.out[u][v] = self.inn[v][u] = weight
+        self.integer_weights = self.integer_weights and isinstance(weight, (int, np.integer))
+        if old is None or weight < old:
+            changed = self._decrease(u, v)
+        elif weight > old and self.pred[v] == u:
+            changed = self._increase(v)
+        else:
+            changed = []
+        return [self.labels[x] for x in changed]
+
+    def remove_edge(self, u, v):
+        u, v = self.index[u], self.index[v]
+        if v not in self.out[u]:
+            raise KeyError((self.labels[u], self.labels[v]))
+        del self.out[u][v], self.inn[v][u]
+        changed = self._increase(v) if self.pred[v] == u else []
+        return [self.labels[x] for x in changed]
+
+    def _decrease(self, u, v):
+        # a cheaper way into v: improve distances outwards from v, as in Dijkstra;
+        # v's old subtree is reached again since all of it gets strictly closer
+        d = self.dist[u] + self.out[u][v]
+        if not d < self.dist[v]:
+            return []
+        dist, pred = self.dist, self.pred
+        dist[v], pred[v] = d, u
+        changed = {v: None}
+        pq = [(d, v)]
+        while pq:
+            current_distance, current_node = heapq.heappop(pq)
+            if current_distance > dist[current_node]:
+                continue
+            for neighbor, weight in self.out[current_node].items():
+                distance = current_distance + weight
+                if distance < dist[neighbor]:
+                    dist[neighbor], pred[neighbor] = distance, current_node
+                    changed[neighbor] = None
+                    heapq.heappush(pq, (distance, neighbor))
+        return list(changed)
+
+    def _increase(self, v):
+        # v's tree edge got worse or disappeared: only v's subtree can move. Each
+        # subtree node restarts from its best edge out of the rest of the tree,
+        # then a Dijkstra restricted to the subtree settles them.
+        dist, pred = self.dist, self.pred
+        affected, stack = {v}, [v]
+        while stack:
+            x = stack.pop()
+            for y in self.out[x]:
+                if pred[y] == x and y not in affected:
+                    affected.add(y)
+                    stack.append(y)
+        old = {x: (dist[x], pred[x]) for x in affected}
+
+        pq = []
+        for x in affected:
+            dist[x], pred[x] = INF, -1
+            for p, weight in self.inn[x].items():
+                if p not in affected and dist[p] + weight < dist[x]:
+                    dist[x], pred[x] = dist[p] + weight, p
+            if dist[x] < INF:
+                pq.append((dist[x], x))
+        heapq.heapify(pq)
+
+        order = []
+        while pq:
+            current_distance, current_node = heapq.heappop(pq)
+            if current_distance > dist[current_node]:
+                continue
+            order.append(current_node)
+            for neighbor, weight in self.out[current_node].items():
+                distance = current_distance + weight
+                if neighbor in affected and distance < dist[neighbor]:
+                    dist[neighbor], pred[neighbor] = distance, current_node
+                    heapq.heappush(pq, (distance, neighbor))
+
+        # parents settle first, so a moved parent marks its whole new subtree
+        changed = {x: None for x in affected if dist[x] == INF}
+        for x in order:
+            if (dist[x], pred[x]) != old[x] or pred[x] in changed:
+                changed[x] = None
+        return list(changed)
+
+    def graph(self):
+        sources = [u for u, edges in enumerate(self.out) for _ in edges]
+        targets = [v for edges in self.out for v in edges]
+        weights = [w for edges in self.out for w in edges.values()]
+        graph = CSRGraph.from_edges(self.labels, sources, targets,
+                                    np.asarray(weights, dtype=np.int64 if self.integer_weights else np.float64))
+        graph._index = self.index
+        return graph
+
+    def tree(self):
+        # snapshot as a ShortestPathTree; settle order is rebuilt top-down from the tree
+        children = [[] for _ in self.labels]
+        for x, p in enumerate(self.pred):
+            if p >= 0:
+                children[p].append(x)
+        order = [self.source]
+        for x in order:
+            order.extend(children[x])
+        return ShortestPathTree(self.graph(), self.source, self.dist, self.pred, order)
+
+    def refresh_frame(self, frame, changed, separator=" -> ", no_path="No path"):
+        # update the rows of a ShortestPathTree.to_frame() table for the changed vertices only
+        mask = frame["Vertex"].isin(changed).to_numpy()
+        if not mask.any():
+            return frame
+        ids = [self.index[node] for node in frame["Vertex"][mask]]
+        dist = [self._value(self.dist[i]) for i in ids]
+        if INF in dist and frame["Shortest Distance"].dtype.kind in 'iu':
+            frame["Shortest Distance"] = frame["Shortest Distance"].astype(np.float64)
+        frame.loc[mask, "Shortest Distance"] = dist
+        pred = (self.labels[self.pred[i]] if self.pred[i] >= 0 else None for i in ids)
+        frame.loc[mask, "Predecessor"] = np.fromiter(pred, dtype=object, count=len(ids))
+        paths = (separator.join(str(self.labels[x]) for x in self.path_ids(i)) for i in ids)
+        frame.loc[mask, "Shortest Path"] = [path or no_path for path in paths]
+        return frame
@@ -1,6 +1,12 @@
-import heapq
+import argparse
 import pandas as pd
-import networkx as nx
+from csr import as_csr
+from paths import ShortestPathTree
+from queues import dijkstra_queue
+from query import shortest_path
+from loader import load_edge_list
+from ch import ContractionHierarchy
+from tour import find_best_tour_with_steps, find_cheapest_tour_with_steps
 
 
 # Definition of the graph
@@ -19,113 +25,74 @@ graph = {
     'Z': {'S': 4, 'N': 3}
 }
 
-# Dijkstra's Algorithm
-def dijkstra(graph, start):
-    pq = []
-    heapq.heappush(pq, (0, start))
-    distances = {node: float('inf') for node in graph}
-    distances[start] = 0
-    predecessors = {node: None for node in graph}
-
-    while pq:
-        current_distance, current_node = heapq.heappop(pq)
-
-        if current_distance > distances[current_node]:
-            continue
-
-        for neighbor, weight in graph[current_node].items():
-            distance = current_distance + weight
-
-            if distance < distances[neighbor]:
-                distances[neighbor] = distance
-                predecessors[neighbor] = current_node
-                heapq.heappush(pq, (distance, neighbor))
-
-    return distances, predecessors
+# Dijkstra's Algorithm, returns the shortest path tree rooted at start;
+# queue picks the priority queue ('heap', 'dial', 'radix' or 'auto')
+def dijkstra(graph, start, queue=None):
+    graph = as_csr(graph)
+    return dijkstra_queue(graph, graph.id_of(start), queue)
 
 # Function to reconstruct the path from Dijkstra's results
 def reconstruct_path(predecessors, start, end):
+    if isinstance(predecessors, ShortestPathTree):
+        path = predecessors.path(end)
+        return path if path and path[0] == start else []
     path = []
     while end is not None:
-        path.insert(0, end)
+        path.append(end)
         end = predecessors[end]
+    path.reverse()
     return path if path and path[0] == start else []
 
-# Running Dijkstra's algorithm from vertex 'P'
-start_node = 'P'
-distances, predecessors = dijkstra(graph, start_node)
-
-# Reconstructing paths for each vertex
-full_paths = {node: reconstruct_path(predecessors, start_node, node) for node in graph}
-
-# Displaying results in a table
-df_full_paths = pd.DataFrame({
-    "Vertex": list(graph.keys()),
-    "Shortest Distance": [distances[node] for node in graph.keys()],
-    "Shortest Path": [" -> ".join(full_paths[node]) if full_paths[node] else "No path" for node in graph.keys()]
-})
-
-print(df_full_paths)
-
-# Algorithm to traverse the entire graph at the lowest cost (displaying all steps)
-def find_cheapest_tour_with_steps(graph, start):
-    G = nx.DiGraph()
-    for node, edges in graph.items():
-        for neighbor, weight in edges.items():
-            G.add_edge(node, neighbor, weight=weight)
-
-    path = []
-    total_cost = 0
-    detailed_path = []
-    unvisited = set(graph.keys())
-    current_node = start
-
-    while unvisited:
-        path.append(current_node)
-        unvisited.remove(current_node)
-
-        neighbors = [(neighbor, G[current_node][neighbor]['weight']) for neighbor in G.successors(current_node) if
-                     neighbor in unvisited]
-
-        if not neighbors:
-            if unvisited:
-                # If we cannot proceed to remaining vertices, use Dijkstra to find a new path
-                remaining_nodes = list(unvisited)
-                distances, predecessors = dijkstra(graph, current_node)
-                next_node = min(remaining_nodes, key=lambda node: distances[node])
-
-                # Reconstruct the full path to the new vertex
-                sub_path = reconstruct_path(predecessors, current_node, next_node)
-
-                # Add the full path to the detailed tour
-                for i in range(1, len(sub_path)):
-                    detailed_path.append((sub_path[i - 1], sub_path[i], G[sub_path[i - 1]][sub_path[i]]['weight']))
-                    total_cost += G[sub_path[i - 1]][sub_path[i]]['weight']
-
-                current_node = next_node
-            else:
-                break
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Shortest paths and tours over the lab graph or an edge list.")
+    parser.add_argument('edges', nargs='?', help="CSV/TSV edge list of source,target,weight rows (default: the lab graph)")
+    parser.add_argument('--start', default='P', help="vertex the paths and tours start from")
+    parser.add_argument('--end', help="also print the shortest path from --start to this vertex")
+    parser.add_argument('--method', choices=('dijkstra', 'bidirectional', 'ch'), default='dijkstra',
+                        help="point-to-point search used for --end; ch preprocesses a contraction hierarchy (cached)")
+    args = parser.parse_args()
+    if args.edges:
+        graph = load_edge_list(args.edges)
+
+    # Running Dijkstra's algorithm from the start vertex
+    start_node = args.start
+    tree = dijkstra(graph, start_node)
+
+    # Displaying results in a table, paths are built from the tree without per-node lists
+    df_full_paths = tree.to_frame(nodes=graph.keys() if isinstance(graph, dict) else None)
+
+    print(df_full_paths)
+
+    # Single pair query, stopping as soon as the end vertex is settled
+    if args.end is not None:
+        if args.method == 'ch':
+            distance, path = ContractionHierarchy.build(graph).query(start_node, args.end)
         else:
-            next_node, cost = min(neighbors, key=lambda x: x[1])
-            detailed_path.append((current_node, next_node, cost))
-            total_cost += cost
-            current_node = next_node
-
-    return detailed_path, total_cost
-
-# Finding the cheapest tour covering the entire graph with step-by-step transitions
-start_node = 'P'
-detailed_path, cost = find_cheapest_tour_with_steps(graph, start_node)
-
-# Preparing a table for display
-df_detailed_path = pd.DataFrame({
-    "Step": list(range(1, len(detailed_path) + 1)),
-    "From": [step[0] for step in detailed_path],
-    "To": [step[1] for step in detailed_path],
-    "Cost": [step[2] for step in detailed_path]
-})
-
-# Displaying the table without indexing
-print("Detailed path traversing the entire graph from P:")
-print(df_detailed_path.to_string(index=False, header=True))
-print(f"Total traversal cost: {cost}")
+            distance, path = shortest_path(graph, start_node, args.end, method=args.method)
+        print(f"Shortest path {start_node} -> {args.end} ({args.method}): "
+              f"{' -> '.join(map(str, path)) or 'No path'}, cost {distance}")
+
+    # Finding the cheapest tour covering the entire graph with step-by-step transitions
+    detailed_path, cost = find_cheapest_tour_with_steps(graph, start_node)
+
+    # Preparing a table for display
+    df_detailed_path = pd.DataFrame({
+        "Step": list(range(1, len(detailed_path) + 1)),
+        "From": [step[0] for step in detailed_path],
+        "To": [step[1] for step in detailed_path],
+        "Cost": [step[2] for step in detailed_path]
+    })
+
+    # Displaying the table without indexing
+    print(f"Detailed path traversing the entire graph from {start_node}:")
+    print(df_detailed_path.to_string(index=False, header=True))
+    print(f"Total traversal cost: {cost}")
+
+    # Optimized tour: exact for small graphs, time-bounded local search for large ones
+    detailed_path, cost = find_best_tour_with_steps(graph, start_node, time_budget=1.0)
+    df_best_path = pd.DataFrame(detailed_path, columns=["From", "To", "Cost"])
+    df_best_path.insert(0, "Step", range(1, len(detailed_path) + 1))
+
+    print(f"Optimized path traversing the entire graph from {start_node}:")
+    print(df_best_path.to_string(index=False, header=True))
+    print(f"Total traversal cost: {cost}")
@@ -0,0 +1,124 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from csr import CSRGraph
+from oracle import CACHE_DIR
+
+CHUNK_ROWS = 1_000_000
+
+
+def separator_for(filename):
+    return '\t' if filename.lower().endswith(('.tsv', '.tab')) else ','
+
+def cache_key(filename, **options):
+    # the file's identity (path, size, mtime) plus every option that changes the result
+    stat = os.stat(filename)
+    key = {'path': os.path.abspath(filename), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, **options}
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+def intern(values, index, strict, first_line):
+    # map one chunk of node labels (all sources, then all targets) to ids;
+    # only the chunk's distinct labels touch the dict
+    rows = len(values) // 2
+    codes, uniques = pd.factorize(values)
+    if strict:
+        ids = np.fromiter((index.get(label, -1) for label in uniques), dtype=np.int64, count=len(uniques))
+    else:
+        ids = np.fromiter((index.setdefault(label, len(index)) for label in uniques), dtype=np.int64, count=len(uniques))
+    mapped = np.where(codes < 0, -1, ids[codes])
+    bad = np.flatnonzero(mapped < 0)
+    if bad.size:
+        i = bad[0]
+        problem = "a missing node" if codes[i] < 0 else f"unknown node {values[i]!r}"
+        raise ValueError(f"Edge on line {first_line + i % rows} of the edge list has {problem}.")
+    return mapped
+
+def read_edge_list(filename, source=0, target=1, weight=2, sep=None, header=None, nodes=None,
+                   node_dtype=str, chunk_rows=CHUNK_ROWS):
+    # Stream a CSV/TSV edge list into a CSRGraph without a dict-of-dicts. Columns are
+    # names (header row) or positions. With `nodes`, every edge endpoint must be one of
+    # them; otherwise endpoints seen only as targets become nodes without edges.
+    # weight=None gives every edge weight 1.
+    sep = sep or separator_for(filename)
+    if header is None:
+        header = any(isinstance(c, str) for c in (source, target, weight))
+    if header:
+        names = pd.read_csv(filename, sep=sep, nrows=0).columns
+        source, target, weight = (names[c] if isinstance(c, int) else c for c in (source, target, weight))
+    columns = [source, target] + ([] if weight is None else [weight])
+    index = {} if nodes is None else {label: i for i, label in enumerate(nodes)}
+    sources, targets, weights = [], [], []
+    first_line = 2 if header else 1
+
+    reader = pd.read_csv(filename, sep=sep, header=0 if header else None, usecols=columns,
+                         dtype={source: node_dtype, target: node_dtype}, chunksize=chunk_rows)
+    for chunk in reader:
+        rows = len(chunk)
+        ids = intern(np.concatenate((chunk[source].to_numpy(), chunk[target].to_numpy())),
+                     index, nodes is not None, first_line)
+        sources.append(ids[:rows])
+        targets.append(ids[rows:])
+        if weight is None:
+            weights.append(np.ones(rows, dtype=np.int64))
+        else:
+            w = pd.to_numeric(chunk[weight]).to_numpy()
+            bad = np.flatnonzero(~(w >= 0))
+            if bad.size:
+                raise ValueError(f"Edge on line {first_line + bad[0]} of the edge list has weight {w[bad[0]].item()!r}, "
+                                 "weights must be non-negative numbers.")
+            weights.append(w)
+        first_line += rows
+
+    empty = np.zeros(0, dtype=np.int64)
+    return CSRGraph.from_edges(list(index), np.concatenate(sources or [empty]),
+                               np.concatenate(targets or [empty]), np.concatenate(weights or [empty]))
+
+def load_edge_list(filename, source=0, target=1, weight=2, sep=None, header=None, nodes=None,
+                   node_dtype=str, chunk_rows=CHUNK_ROWS, cache_dir=CACHE_DIR):
+    # read_edge_list behind a binary cache: the first load parses the file and saves
+    # the CSR arrays, later loads memory-map them until the file changes
+    cache_path = None
+    if cache_dir:
+        nodes = None if nodes is None else list(nodes)
+        key = cache_key(filename, source=source, target=target, weight=weight, sep=sep, header=header,
+                        nodes=hashlib.sha256('\0'.join(map(str, nodes)).encode()).hexdigest() if nodes else None,
+                        node_dtype=getattr(node_dtype, '__name__', node_dtype))
+        cache_path = os.path.join(cache_dir, 'edges-' + key)
+        if os.path.isdir(cache_path):
+            return CSRGraph.load(cache_path)
+
+    graph = read_edge_list(filename, source, target, weight, sep, header, nodes, node_dtype, chunk_rows)
+    if cache_path:
+        try:
+            graph.save(cache_path)
+        except OSError:
+            # an unwritable cache only means parsing the file again next time
+            return graph
+        # hand back the mapped copy, so the first run behaves like every later one
+        return CSRGraph.load(cache_path)
+    return graph
+
+def column(value):
+    return int(value) if value.isdigit() else value
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load a CSV/TSV edge list into the binary graph cache.")
+    parser.add_argument('edges', help="edge list file, one source,target[,weight] row per edge")
+    parser.add_argument('--source', type=column, default=0, help="source column name or position")
+    parser.add_argument('--target', type=column, default=1, help="target column name or position")
+    parser.add_argument('--weight', type=column, default=2, help="weight column name or position")
+    parser.add_argument('--unweighted', action='store_true', help="no weight column, every edge costs 1")
+    parser.add_argument('--sep', help="field separator (default: tab for .tsv/.tab, comma otherwise)")
+    parser.add_argument('--header', action='store_true', default=None, help="first row is a header")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    loaded = load_edge_list(args.edges, args.source, args.target, None if args.unweighted else args.weight,
+                            args.sep, args.header, chunk_rows=args.chunk_rows, cache_dir=args.cache_dir)
+    print(f"{loaded!r} loaded in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,167 @@
+import os
+import numpy as np
+from csr import as_csr, load_arrays, save_arrays
+from paths import dijkstra_csr
+
+CACHE_DIR = os.environ.get('GRAPHS_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'graphs'))
+# Floyd-Warshall does n vectorized n x n passes; below this size or above this
+# edge density it beats running a Python Dijkstra from every node
+FLOYD_WARSHALL_MAX_NODES = 3000
+FLOYD_WARSHALL_SMALL_NODES = 256
+DENSE_EDGE_RATIO = 0.05
+# the dense tables take 12 bytes per node pair (about 300 MB at this size); larger
+# graphs get their lookups from one Dijkstra tree per source instead
+ORACLE_MAX_NODES = 5000
+
+
+def floyd_warshall(graph):
+    n = graph.num_nodes
+    dist = np.full((n, n), np.inf)
+    np.minimum.at(dist, (graph.edge_sources(), graph.indices), graph.weights.astype(np.float64))
+    next_hop = np.where(np.isfinite(dist), np.arange(n)[None, :], -1).astype(np.int32)
+    np.fill_diagonal(dist, 0)
+    np.fill_diagonal(next_hop, np.arange(n))
+
+    for k in range(n):
+        through_k = dist[:, k, None] + dist[None, k, :]
+        better = through_k < dist
+        dist[better] = through_k[better]
+        next_hop[better] = np.broadcast_to(next_hop[:, k, None], (n, n))[better]
+    return dist, next_hop
+
+def repeated_dijkstra(graph):
+    n = graph.num_nodes
+    dist = np.empty((n, n))
+    next_hop = np.full((n, n), -1, dtype=np.int32)
+    for source in range(n):
+        tree = dijkstra_csr(graph, source)
+        dist[source] = tree.dist
+        # first hop towards v is inherited from v's parent, parents are settled first
+        row = next_hop[source]
+        pred = tree.pred.tolist()
+        for v in tree.order.tolist():
+            p = pred[v]
+            row[v] = v if p == source or p < 0 else row[p]
+    return dist, next_hop
+
+def choose_method(graph):
+    n = graph.num_nodes
+    if n <= FLOYD_WARSHALL_SMALL_NODES:
+        return 'floyd-warshall'
+    if n <= FLOYD_WARSHALL_MAX_NODES and graph.num_edges >= DENSE_EDGE_RATIO * n * n:
+        return 'floyd-warshall'
+    return 'dijkstra'
+
+
+# All-pairs distance and next-hop table: distance lookups are O(1) and paths
+# are followed hop by hop in O(path length)
+class DistanceOracle:
+    def __init__(self, graph, dist, next_hop):
+        self.graph = graph
+        self.dist = dist
+        self.next_hop = next_hop
+
+    @classmethod
+    def cached(cls, graph, cache_dir=CACHE_DIR):
+        # the oracle saved for this graph by an earlier build, or None
+        graph = as_csr(graph)
+        if cache_dir:
+            cache_path = os.path.join(cache_dir, 'oracle-' + graph.fingerprint())
+            if os.path.isdir(cache_path):
+                return cls.load(graph, cache_path)
+        return None
+
+    @classmethod
+    def build(cls, graph, method='auto', cache_dir=CACHE_DIR):
+        graph = as_csr(graph)
+        oracle = cls.cached(graph, cache_dir)
+        if oracle is not None:
+            return oracle
+        cache_path = os.path.join(cache_dir, 'oracle-' + graph.fingerprint()) if cache_dir else None
+
+        if method == 'auto':
+            method = choose_method(graph)
+        if method == 'floyd-warshall':
+            dist, next_hop = floyd_warshall(graph)
+        elif method == 'dijkstra':
+            dist, next_hop = repeated_dijkstra(graph)
+        else:
+            raise ValueError(f"Unknown method {method!r}, expected 'auto', 'floyd-warshall' or 'dijkstra'.")
+
+        oracle = cls(graph, dist, next_hop)
+        if cache_path:
+            try:
+                oracle.save(cache_path)
+            except OSError:
+                # an unwritable cache only means the next run builds the table again
+                pass
+        return oracle
+
+    @classmethod
+    def load(cls, graph, directory):
+        arrays = load_arrays(directory, ('dist', 'next_hop'))
+        return cls(graph, arrays['dist'], arrays['next_hop'])
+
+    def save(self, directory):
+        save_arrays(directory, {'dist': np.asarray(self.dist), 'next_hop': np.asarray(self.next_hop)})
+
+    def distances_from(self, u):
+        return self.dist[u]
+
+    def distance_ids(self, u, v):
+        return self.dist[u, v].item()
+
+    def distance(self, u, v):
+        d = self.distance_ids(self.graph.id_of(u), self.graph.id_of(v))
+        return int(d) if self.graph.integer_weights and np.isfinite(d) else d
+
+    def path_ids(self, u, v):
+        if self.next_hop[u, v] < 0:
+            return []
+        path = [u]
+        while u != v:
+            u = int(self.next_hop[u, v])
+            path.append(u)
+        return path
+
+    def path(self, u, v):
+        labels = self.graph.labels
+        return [labels[i] for i in self.path_ids(self.graph.id_of(u), self.graph.id_of(v))]
+
+
+# The DistanceOracle lookups answered by Dijkstra from the queried source, for graphs
+# too large for the dense tables. The last tree is kept: the tour builder asks for
+# distances and then a path from the same source.
+class SourceTreeOracle:
+    def __init__(self, graph):
+        self.graph = as_csr(graph)
+        self._tree = None
+
+    def tree(self, u):
+        if self._tree is None or self._tree.source != u:
+            self._tree = dijkstra_csr(self.graph, u)
+        return self._tree
+
+    def distances_from(self, u):
+        return self.tree(u).dist
+
+    def distance_ids(self, u, v):
+        return self.tree(u).dist[v].item()
+
+    def distance(self, u, v):
+        d = self.distance_ids(self.graph.id_of(u), self.graph.id_of(v))
+        return int(d) if self.graph.integer_weights and np.isfinite(d) else d
+
+    def path_ids(self, u, v):
+        return self.tree(u).path_ids(v)
+
+    def path(self, u, v):
+        labels = self.graph.labels
+        return [labels[i] for i in self.path_ids(self.graph.id_of(u), self.graph.id_of(v))]
+
+def build_oracle(graph, cache_dir=CACHE_DIR):
+    # the dense all-pairs oracle while it fits in memory, per-source Dijkstra above that
+    graph = as_csr(graph)
+    if graph.num_nodes > ORACLE_MAX_NODES:
+        return SourceTreeOracle(graph)
+    return DistanceOracle.build(graph, cache_dir=cache_dir)
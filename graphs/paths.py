@@ -0,0 +1,115 @@
+import heapq
+import numpy as np
+import pandas as pd
+
+
+# Result of a single-source shortest path run: one distance and one predecessor
+# per node id (-1 for the source and unreachable nodes) plus the order in which
+# nodes were settled. Paths are only built when asked for.
+class ShortestPathTree:
+    def __init__(self, graph, source, distances, predecessors, order):
+        self.graph = graph
+        self.source = source
+        self.dist = np.asarray(distances, dtype=np.float64)
+        self.pred = np.asarray(predecessors, dtype=np.int64)
+        self.order = np.asarray(order, dtype=np.int64)
+
+    @property
+    def start(self):
+        return self.graph.labels[self.source]
+
+    def _value(self, d):
+        if self.graph.integer_weights and np.isfinite(d):
+            return int(d)
+        return float(d)
+
+    def distance(self, node):
+        return self._value(self.dist[self.graph.id_of(node)])
+
+    def reachable(self, node):
+        return bool(np.isfinite(self.dist[self.graph.id_of(node)]))
+
+    def path_ids(self, target):
+        if not np.isfinite(self.dist[target]):
+            return []
+        pred = self.pred
+        path = [target]
+        while pred[path[-1]] >= 0:
+            path.append(int(pred[path[-1]]))
+        path.reverse()
+        return path
+
+    def path(self, node):
+        labels = self.graph.labels
+        return [labels[i] for i in self.path_ids(self.graph.id_of(node))]
+
+    def paths(self, nodes=None):
+        # one path at a time, nothing is kept between iterations
+        for node in self.graph.labels if nodes is None else nodes:
+            yield node, self.path(node)
+
+    @property
+    def distances(self):
+        return {label: self._value(d) for label, d in zip(self.graph.labels, self.dist)}
+
+    @property
+    def predecessors(self):
+        labels = self.graph.labels
+        return {label: labels[p] if p >= 0 else None for label, p in zip(labels, self.pred.tolist())}
+
+    def path_strings(self, separator=" -> "):
+        # parents are settled before their children, so every path string is its
+        # parent's string plus one label
+        labels = self.graph.labels
+        strings = np.full(len(self.dist), None, dtype=object)
+        pred = self.pred.tolist()
+        for v in self.order.tolist():
+            p = pred[v]
+            strings[v] = str(labels[v]) if p < 0 else strings[p] + separator + str(labels[v])
+        return strings
+
+    def to_frame(self, nodes=None, no_path="No path"):
+        ids = np.arange(len(self.dist)) if nodes is None else np.array([self.graph.id_of(n) for n in nodes], dtype=np.int64)
+        dist = self.dist[ids]
+        if self.graph.integer_weights and np.isfinite(dist).all():
+            dist = dist.astype(np.int64)
+        paths = self.path_strings()[ids]
+        paths[pd.isna(paths)] = no_path
+        pred = self.pred[ids]
+        labels = np.fromiter(self.graph.labels, dtype=object, count=len(self.dist))
+        return pd.DataFrame({
+            "Vertex": labels[ids],
+            "Shortest Distance": dist,
+            "Predecessor": np.where(pred >= 0, labels[np.maximum(pred, 0)], None),
+            "Shortest Path": paths,
+        })
+
+
+# Dijkstra's Algorithm on the CSR arrays
+def dijkstra_csr(graph, source):
+    indptr = memoryview(graph.indptr)
+    indices = memoryview(graph.indices)
+    weights = memoryview(graph.weights)
+    distances = [float('inf')] * graph.num_nodes
+    predecessors = [-1] * graph.num_nodes
+    order = []
+    distances[source] = 0
+    pq = [(0, source)]
+
+    while pq:
+        current_distance, current_node = heapq.heappop(pq)
+
+        if current_distance > distances[current_node]:
+            continue
+        order.append(current_node)
+
+        for k in range(indptr[current_node], indptr[current_node + 1]):
+            neighbor = indices[k]
+            distance = current_distance + weights[k]
+
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(pq, (distance, neighbor))
+
+    return ShortestPathTree(graph, source, distances, predecessors, order)
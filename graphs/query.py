@@ -0,0 +1,114 @@
+import heapq
+from csr import as_csr
+
+METHODS = ('dijkstra', 'bidirectional', 'astar')
+
+
+def _walk(pred, node):
+    path = []
+    while node >= 0:
+        path.append(node)
+        node = pred[node]
+    return path
+
+def dijkstra_to(graph, source, target, heuristic=None):
+    # Dijkstra that stops as soon as target is settled; with a heuristic
+    # (lower bound of the remaining distance per node id) this is A*
+    indptr = memoryview(graph.indptr)
+    indices = memoryview(graph.indices)
+    weights = memoryview(graph.weights)
+    h = heuristic or (lambda node: 0)
+    distances = {source: 0}
+    predecessors = {source: -1}
+    settled = 0
+    pq = [(h(source), 0, source)]
+
+    while pq:
+        _, current_distance, current_node = heapq.heappop(pq)
+
+        if current_distance > distances[current_node]:
+            continue
+        settled += 1
+        if current_node == target:
+            path = _walk(predecessors, target)
+            path.reverse()
+            return current_distance, path, settled
+
+        for k in range(indptr[current_node], indptr[current_node + 1]):
+            neighbor = indices[k]
+            distance = current_distance + weights[k]
+
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(pq, (distance + h(neighbor), distance, neighbor))
+
+    return float('inf'), [], settled
+
+def bidirectional_dijkstra(graph, source, target):
+    # forward search on the graph, backward search on its reverse, stop once the
+    # two queue minima together cannot beat the best meeting point found so far
+    sides = []
+    for g, root in ((graph, source), (graph.reverse(), target)):
+        sides.append({
+            'indptr': memoryview(g.indptr), 'indices': memoryview(g.indices), 'weights': memoryview(g.weights),
+            'dist': {root: 0}, 'pred': {root: -1}, 'pq': [(0, root)],
+        })
+    best, meeting, settled = float('inf'), -1, 0
+    if source == target:
+        return 0, [source], 1
+
+    while sides[0]['pq'] and sides[1]['pq']:
+        if sides[0]['pq'][0][0] + sides[1]['pq'][0][0] >= best:
+            break
+        turn = 0 if sides[0]['pq'][0][0] <= sides[1]['pq'][0][0] else 1
+        side, other = sides[turn], sides[1 - turn]
+        current_distance, current_node = heapq.heappop(side['pq'])
+        if current_distance > side['dist'][current_node]:
+            continue
+        settled += 1
+
+        indptr, indices, weights = side['indptr'], side['indices'], side['weights']
+        for k in range(indptr[current_node], indptr[current_node + 1]):
+            neighbor = indices[k]
+            distance = current_distance + weights[k]
+            if distance < side['dist'].get(neighbor, float('inf')):
+                side['dist'][neighbor] = distance
+                side['pred'][neighbor] = current_node
+                heapq.heappush(side['pq'], (distance, neighbor))
+                if neighbor in other['dist'] and distance + other['dist'][neighbor] < best:
+                    best, meeting = distance + other['dist'][neighbor], neighbor
+
+    if meeting < 0:
+        return float('inf'), [], settled
+    path = _walk(sides[0]['pred'], meeting)
+    path.reverse()
+    path.extend(_walk(sides[1]['pred'], meeting)[1:])
+    return best, path, settled
+
+def shortest_path(graph, start, end, method='dijkstra', heuristic=None, stats=None):
+    # Point-to-point query: (distance, path) as dijkstra(graph, start) +
+    # reconstruct_path would give, without settling the whole graph.
+    # heuristic(label) must never overestimate the remaining distance to end.
+    graph = as_csr(graph)
+    source, target = graph.id_of(start), graph.id_of(end)
+    labels = graph.labels
+
+    if heuristic is not None and method == 'dijkstra':
+        method = 'astar'
+    if method == 'dijkstra':
+        distance, path, settled = dijkstra_to(graph, source, target)
+    elif method == 'astar':
+        if heuristic is None:
+            raise ValueError("A* needs a heuristic.")
+        distance, path, settled = dijkstra_to(graph, source, target, lambda node: heuristic(labels[node]))
+    elif method == 'bidirectional':
+        distance, path, settled = bidirectional_dijkstra(graph, source, target)
+    else:
+        raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}.")
+
+    if stats is not None:
+        stats['settled'] = settled
+    if graph.integer_weights and path:
+        distance = int(distance)
+    return distance, [labels[node] for node in path]
@@ -0,0 +1,130 @@
+from paths import ShortestPathTree, dijkstra_csr
+
+INF = float('inf')
+QUEUES = ('heap', 'dial', 'radix', 'auto')
+# Dial keeps max_weight + 1 buckets and scans them one distance at a time, so it
+# only pays off while the largest weight stays small
+DIAL_MAX_WEIGHT = 255
+
+
+def choose_queue(graph):
+    # bucket queues need non-negative integer keys. Past DIAL_MAX_WEIGHT the heap
+    # stays the choice: in the benchmark the pure-Python radix heap never beats heapq
+    if not graph.integer_weights or not graph.num_edges:
+        return 'heap'
+    if graph.weights.min() < 0 or graph.weights.max() > DIAL_MAX_WEIGHT:
+        return 'heap'
+    return 'dial'
+
+
+# Dial's bucket queue: bucket d % (C + 1) holds the unsettled nodes at distance d,
+# C being the largest weight. A better distance moves the node between buckets,
+# so no stale entries are ever popped.
+def dijkstra_dial(graph, source):
+    indptr = memoryview(graph.indptr)
+    indices = memoryview(graph.indices)
+    weights = memoryview(graph.weights)
+    span = int(graph.weights.max()) + 1 if graph.num_edges else 1
+    buckets = [set() for _ in range(span)]
+    distances = [INF] * graph.num_nodes
+    predecessors = [-1] * graph.num_nodes
+    order = []
+    distances[source] = 0
+    buckets[0].add(source)
+    queued, current_distance = 1, 0
+
+    while queued:
+        bucket = buckets[current_distance % span]
+        while not bucket:
+            current_distance += 1
+            bucket = buckets[current_distance % span]
+        current_node = bucket.pop()
+        queued -= 1
+        order.append(current_node)
+
+        for k in range(indptr[current_node], indptr[current_node + 1]):
+            neighbor = indices[k]
+            distance = current_distance + weights[k]
+
+            if distance < distances[neighbor]:
+                if distances[neighbor] == INF:
+                    queued += 1
+                else:
+                    buckets[distances[neighbor] % span].discard(neighbor)
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                buckets[distance % span].add(neighbor)
+
+    return ShortestPathTree(graph, source, distances, predecessors, order)
+
+
+# Radix heap for monotone integer keys: an entry lives in bucket
+# bit_length(key ^ last popped key), so it moves at most once per bit on its
+# way to bucket 0 and every move is a plain list append.
+class RadixHeap:
+    def __init__(self):
+        self.buckets = [[] for _ in range(65)]
+        self.last = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, key, value):
+        self.buckets[(key ^ self.last).bit_length()].append((key, value))
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            # every entry of the first non-empty bucket lands in a lower one once last moves up to its minimum
+            entries, buckets[i] = buckets[i], []
+            self.last = last = min(entries)[0]
+            for entry in entries:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+        self.size -= 1
+        return buckets[0].pop()
+
+def dijkstra_radix(graph, source):
+    indptr = memoryview(graph.indptr)
+    indices = memoryview(graph.indices)
+    weights = memoryview(graph.weights)
+    distances = [INF] * graph.num_nodes
+    predecessors = [-1] * graph.num_nodes
+    order = []
+    distances[source] = 0
+    pq = RadixHeap()
+    pq.push(0, source)
+
+    while pq:
+        current_distance, current_node = pq.pop()
+
+        if current_distance > distances[current_node]:
+            continue
+        order.append(current_node)
+
+        for k in range(indptr[current_node], indptr[current_node + 1]):
+            neighbor = indices[k]
+            distance = current_distance + weights[k]
+
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                pq.push(distance, neighbor)
+
+    return ShortestPathTree(graph, source, distances, predecessors, order)
+
+def dijkstra_queue(graph, source, queue=None):
+    # single-source Dijkstra with a selectable priority queue; None is the binary heap
+    if queue == 'auto':
+        queue = choose_queue(graph)
+    if queue in (None, 'heap'):
+        return dijkstra_csr(graph, source)
+    if queue not in ('dial', 'radix'):
+        raise ValueError(f"Unknown queue {queue!r}, expected one of {QUEUES}.")
+    if not graph.integer_weights or (graph.num_edges and graph.weights.min() < 0):
+        raise ValueError(f"The {queue} queue needs non-negative integer weights.")
+    return dijkstra_dial(graph, source) if queue == 'dial' else dijkstra_radix(graph, source)
@@ -0,0 +1,242 @@
+import time
+import numpy as np
+from csr import as_csr
+from oracle import ORACLE_MAX_NODES, DistanceOracle, build_oracle
+from paths import dijkstra_csr
+
+# Up to this many nodes the tour is solved exactly (Held-Karp keeps 2^(n-1) * (n-1) costs)
+HELD_KARP_MAX_NODES = 18
+IMPROVEMENT_EPS = 1e-9
+
+
+def held_karp(cost):
+    # exact cheapest open path from node 0 through every node of the cost matrix;
+    # subsets are processed one popcount layer at a time, all masks of a layer at once
+    n = len(cost)
+    if n == 1:
+        return [0]
+    m = n - 1
+    inner = cost[1:, 1:]
+    full = (1 << m) - 1
+    masks = np.arange(1 << m)
+    popcount = np.zeros(1 << m, dtype=np.int8)
+    for bit in range(m):
+        popcount += (masks >> bit) & 1
+
+    dp = np.full((1 << m, m), np.inf)
+    parent = np.full((1 << m, m), -1, dtype=np.int8)
+    dp[1 << np.arange(m), np.arange(m)] = cost[0, 1:]
+    for size in range(1, m):
+        layer = masks[popcount == size]
+        for j in range(m):
+            sel = layer[(layer >> j) & 1 == 0]
+            candidates = dp[sel] + inner[:, j]
+            best = candidates.argmin(axis=1)
+            dp[sel | (1 << j), j] = candidates[np.arange(len(sel)), best]
+            parent[sel | (1 << j), j] = best
+
+    order = []
+    mask, j = full, int(dp[full].argmin())
+    while j >= 0:
+        order.append(j + 1)
+        mask, j = mask & ~(1 << j), int(parent[mask, j])
+    order.append(0)
+    order.reverse()
+    return order
+
+def tour_cost(cost, order):
+    order = np.asarray(order)
+    return cost[order[:-1], order[1:]].sum()
+
+def greedy_order(cost):
+    n = len(cost)
+    order = [0]
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, cost[order[-1]])
+        nxt = int(row.argmin())
+        order.append(nxt)
+        visited[nxt] = True
+    return order
+
+def two_opt_pass(cost, order, deadline):
+    # reverse order[i..j]; on a directed metric the reversed segment is re-priced
+    # with prefix sums of the backward edge costs
+    n = len(order)
+    improved = False
+    for i in range(1, n - 1):
+        if time.perf_counter() > deadline:
+            break
+        t = np.asarray(order)
+        forward = np.concatenate(([0.0], np.cumsum(cost[t[:-1], t[1:]])))
+        backward = np.concatenate(([0.0], np.cumsum(cost[t[1:], t[:-1]])))
+        j = np.arange(i + 1, n)
+        after = np.minimum(j + 1, n - 1)
+        tail = j < n - 1
+        old = cost[t[i - 1], t[i]] + forward[j] - forward[i] + np.where(tail, cost[t[j], t[after]], 0)
+        new = cost[t[i - 1], t[j]] + backward[j] - backward[i] + np.where(tail, cost[t[i], t[after]], 0)
+        gain = old - new
+        best = int(gain.argmax())
+        if gain[best] > IMPROVEMENT_EPS:
+            k = int(j[best])
+            order[i:k + 1] = order[i:k + 1][::-1]
+            improved = True
+    return improved
+
+def or_opt_pass(cost, order, deadline, max_segment=3):
+    # move a segment of 1..max_segment nodes (kept in direction) to its best position
+    improved = False
+    for length in range(1, max_segment + 1):
+        i = 1
+        while i + length <= len(order):
+            if time.perf_counter() > deadline:
+                return improved
+            segment = order[i:i + length]
+            rest = np.asarray(order[:i] + order[i + length:])
+            first, last = segment[0], segment[-1]
+            prev = order[i - 1]
+            if i + length < len(order):
+                nxt = order[i + length]
+                saving = cost[prev, first] + cost[last, nxt] - cost[prev, nxt]
+            else:
+                saving = cost[prev, first]
+
+            insert = cost[rest, first].copy()
+            insert[:-1] += cost[last, rest[1:]] - cost[rest[:-1], rest[1:]]
+            gain = saving - insert
+            gain[i - 1] = -np.inf  # putting it back where it was
+            p = int(gain.argmax())
+            if gain[p] > IMPROVEMENT_EPS:
+                rest = rest.tolist()
+                order[:] = rest[:p + 1] + segment + rest[p + 1:]
+                improved = True
+            i += 1
+    return improved
+
+def local_search(cost, order, deadline):
+    while time.perf_counter() < deadline:
+        improved = two_opt_pass(cost, order, deadline)
+        improved = or_opt_pass(cost, order, deadline) or improved
+        if not improved:
+            break
+    return order
+
+def improve_tour(cost, order, time_budget, seed=0):
+    # 2-opt / Or-opt to a local optimum, then random segment-reversal kicks
+    # until the wall-clock budget runs out; the best tour seen is returned
+    deadline = time.perf_counter() + time_budget
+    rng = np.random.default_rng(seed)
+    best = local_search(cost, list(order), deadline)
+    best_cost = tour_cost(cost, best)
+    while time.perf_counter() < deadline and len(best) > 3:
+        candidate = list(best)
+        i, j = sorted(rng.choice(np.arange(1, len(candidate)), 2, replace=False))
+        candidate[i:j + 1] = candidate[i:j + 1][::-1]
+        candidate = local_search(cost, candidate, deadline)
+        candidate_cost = tour_cost(cost, candidate)
+        if candidate_cost < best_cost - IMPROVEMENT_EPS:
+            best, best_cost = candidate, candidate_cost
+    return best
+
+# Algorithm to traverse the entire graph at the lowest cost (displaying all steps)
+def find_cheapest_tour_with_steps(graph, start, oracle=None):
+    csr = as_csr(graph)
+    labels = csr.labels
+
+    path = []
+    total_cost = 0
+    detailed_path = []
+    nodes = graph.keys() if isinstance(graph, dict) else csr.labels
+    unvisited = {csr.id_of(node) for node in nodes}
+    current_node = csr.id_of(start)
+
+    while unvisited:
+        path.append(current_node)
+        unvisited.remove(current_node)
+
+        targets, weights = csr.neighbors(current_node)
+        neighbors = [(neighbor, weight) for neighbor, weight in zip(targets.tolist(), weights.tolist())
+                     if neighbor in unvisited]
+
+        if not neighbors:
+            if unvisited:
+                # If we cannot proceed to remaining vertices, jump to the closest one using
+                # the all-pairs oracle (built once, on the first dead end, and cached on disk;
+                # per-source Dijkstra on graphs too large for it)
+                if oracle is None:
+                    oracle = build_oracle(csr)
+                remaining_nodes = np.array(sorted(unvisited))
+                next_node = int(remaining_nodes[np.argmin(oracle.distances_from(current_node)[remaining_nodes])])
+
+                # Reconstruct the full path to the new vertex
+                sub_path = oracle.path_ids(current_node, next_node)
+
+                # Add the full path to the detailed tour
+                for i in range(1, len(sub_path)):
+                    weight = csr.weight(sub_path[i - 1], sub_path[i])
+                    detailed_path.append((labels[sub_path[i - 1]], labels[sub_path[i]], weight))
+                    total_cost += weight
+
+                current_node = next_node
+            else:
+                break
+        else:
+            next_node, cost = min(neighbors, key=lambda x: x[1])
+            detailed_path.append((labels[current_node], labels[next_node], cost))
+            total_cost += cost
+            current_node = next_node
+
+    return detailed_path, total_cost
+
+def closure_oracle(csr, deadline):
+    # the all-pairs oracle when it is cached, or when building it (estimated as one
+    # timed Dijkstra run per node) fits before the deadline; None otherwise
+    if csr.num_nodes > ORACLE_MAX_NODES:
+        return None
+    oracle = DistanceOracle.cached(csr)
+    if oracle is None:
+        start = time.perf_counter()
+        dijkstra_csr(csr, 0)
+        if start + (time.perf_counter() - start) * csr.num_nodes > deadline:
+            return None
+        oracle = DistanceOracle.build(csr)
+    return oracle
+
+def find_best_tour_with_steps(graph, start, time_budget=1.0, oracle=None, seed=0):
+    # Same (detailed_path, total_cost) output as find_cheapest_tour_with_steps: Held-Karp
+    # on the shortest-path metric closure for small graphs, local search otherwise. The
+    # time_budget covers building the closure too; when that cannot fit, the greedy
+    # tour is returned as it is.
+    deadline = time.perf_counter() + time_budget
+    csr = as_csr(graph)
+    labels = csr.labels
+    if oracle is None:
+        oracle = closure_oracle(csr, deadline)
+        if oracle is None:
+            return find_cheapest_tour_with_steps(graph, start)
+    nodes = graph.keys() if isinstance(graph, dict) else csr.labels
+    start_id = csr.id_of(start)
+    ids = np.array([start_id] + [csr.id_of(node) for node in nodes if node != start])
+
+    closure = np.asarray(oracle.dist)[np.ix_(ids, ids)]
+    finite = closure[np.isfinite(closure)]
+    # unreachable pairs get a penalty larger than any real tour, so they are only used when unavoidable
+    penalty = (finite.max() if finite.size else 1.0) * len(ids) + 1
+    cost = np.where(np.isfinite(closure), closure, penalty)
+
+    if len(ids) <= HELD_KARP_MAX_NODES:
+        order = held_karp(cost)
+    else:
+        order = improve_tour(cost, greedy_order(cost), max(0.0, deadline - time.perf_counter()), seed)
+
+    detailed_path = []
+    total_cost = 0
+    for a, b in zip(order, order[1:]):
+        # an unreachable node is jumped to without steps, as the greedy tour does
+        sub_path = oracle.path_ids(int(ids[a]), int(ids[b]))
+        for u, v in zip(sub_path, sub_path[1:]):
+            weight = csr.weight(u, v)
+            detailed_path.append((labels[u], labels[v], weight))
+            total_cost += weight
+    return detailed_path, total_cost
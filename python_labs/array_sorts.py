@@ -0,0 +1,67 @@
+from array import array
+import numpy as np
+
+# LSD radix sort digit width: 16 bits keeps the digit array at 2 bytes per element
+# and needs only two passes for the lab's inputs (values below 10 * size)
+RADIX_BITS = 16
+# counting sort keeps one int64 count per value of the range, so it only takes ranges up
+# to COUNTING_RANGE_PER_VALUE times the input length and never past COUNTING_MAX_RANGE;
+# wider ranges go to the radix sort
+COUNTING_MAX_RANGE = 1 << 26
+COUNTING_RANGE_PER_VALUE = 16
+
+
+# Integer sorts over array('q') or NumPy buffers. They sort in place through a
+# NumPy view of the buffer, never building a Python list, and return None like
+# the other in-place sorts of sort_times_compare.
+
+def as_view(values):
+    # ndarray as it is, anything else exposing a buffer (array('q'), array('i'), ...) as a view
+    # typed by the buffer's own format; objects without a buffer, like lists, raise TypeError
+    view = values if isinstance(values, np.ndarray) else np.asarray(memoryview(values))
+    if view.dtype.kind != 'i':
+        raise TypeError(f"Expected a signed integer buffer, got dtype {view.dtype}.")
+    if not view.flags.writeable:
+        raise ValueError("The buffer to sort must be writable.")
+    return view
+
+def radix_sort(values, bits=RADIX_BITS):
+    view = as_view(values)
+    if view.size < 2:
+        return
+    low = view.min()
+    # offsets from the minimum as unsigned keys: negatives need no special case, and
+    # only the digits the range actually uses get a pass (wrapping uint64 subtraction
+    # stays exact for the full int64 range)
+    keys = view.astype(np.int64).view(np.uint64) - np.int64(low).view(np.uint64)
+    span = int(keys.max())
+    digit_type = np.uint8 if bits <= 8 else np.uint16 if bits <= 16 else np.uint32
+    mask = np.uint64((1 << bits) - 1)
+    for shift in range(0, span.bit_length(), bits):
+        digits = ((keys >> np.uint64(shift)) & mask).astype(digit_type)
+        # histogram first: a digit that is the same for every key leaves the order as it is
+        if np.bincount(digits).max() == digits.size:
+            continue
+        # stable scatter by digit; NumPy's stable argsort of small unsigned ints is a counting pass in C
+        keys = keys[np.argsort(digits, kind='stable')]
+    view[:] = (keys + np.int64(low).view(np.uint64)).view(np.int64)
+
+def counting_sort(values, max_range=COUNTING_MAX_RANGE):
+    view = as_view(values)
+    if view.size < 2:
+        return
+    low, high = int(view.min()), int(view.max())
+    if high - low >= min(max_range, COUNTING_RANGE_PER_VALUE * view.size):
+        return radix_sort(view)
+    counts = np.bincount(view.astype(np.int64) - low, minlength=high - low + 1)
+    view[:] = np.repeat(np.arange(low, high + 1, dtype=np.int64), counts)
+
+def numpy_sort(values):
+    as_view(values).sort()
+
+# PREPARE hooks for sort_times_compare: untimed copies of the shared input
+def int64_array(data):
+    return array('q', data)
+
+def numpy_array(data):
+    return np.array(data, dtype=np.int64)
@@ -0,0 +1,352 @@
+import argparse
+from array import array
+import contextlib
+import csv
+import json
+import math
+import multiprocessing
+import os
+import platform
+import signal
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+# Benchmark runner for the sorting lab: every algorithm sorts the same seeded
+# input, warmup runs are discarded, repeats are calibrated to a time budget and
+# each cell is reported as median / IQR / 95% confidence interval of the median.
+
+TARGET_TIME_S = 0.5
+MIN_REPEATS = 5
+MAX_REPEATS = 1000
+WARMUP = 1
+Z_95 = 1.96
+# sizes timed once per algorithm to extrapolate the cost of every cell
+PILOT_SIZES = (256, 1024)
+
+# set in every worker by init_worker
+_registry = None
+_prepare = None
+_cpu = None
+
+
+def make_input(size, seed=0):
+    # the lab's input: `size` distinct integers drawn from range(size * 10), fixed per
+    # (seed, size). Built in int64 buffers and handed out as array('q'), never as a list,
+    # so inputs of 10^7-10^8 elements fit in memory.
+    rng = np.random.default_rng([seed, size])
+    # the distinct values of independent draws are a uniformly random subset; an eighth
+    # more draws than needed almost always gives enough of them in one round
+    values = np.zeros(0, dtype=np.int64)
+    while values.size < size:
+        draws = np.concatenate((values, rng.integers(0, size * 10, size + size // 8 + 64, dtype=np.int64)))
+        draws.sort()
+        values = draws[np.concatenate(([True], draws[1:] != draws[:-1]))]
+    rng.shuffle(values)
+    data = array('q')
+    data.frombytes(values[:size].view(np.uint8))
+    return data
+
+def sorts_input(output, data):
+    # vectorised check that the output holds exactly the input's values in ascending order
+    output = np.asarray(output, dtype=np.int64)
+    return output.shape == (len(data),) and np.array_equal(output, np.sort(np.asarray(data, dtype=np.int64)))
+
+def run_once(func, prepare, data):
+    # prepare (copying the input) is not timed; sorts that return None sort in place
+    args = prepare(data)
+    start = time.perf_counter_ns()
+    result = func(args)
+    elapsed = time.perf_counter_ns() - start
+    return elapsed, args if result is None else result
+
+def peak_memory(func, prepare, data):
+    # bytes allocated by the sort on top of its (untraced) input copy, at the highest point
+    args = prepare(data)
+    tracemalloc.start()
+    try:
+        func(args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def calibrate(elapsed_ns, target_time=TARGET_TIME_S, min_repeats=MIN_REPEATS, max_repeats=MAX_REPEATS):
+    return max(min_repeats, min(max_repeats, math.ceil(target_time * 1e9 / max(elapsed_ns, 1))))
+
+def summarize(times_ns):
+    ordered = sorted(times_ns)
+    n = len(ordered)
+    q1, median, q3 = statistics.quantiles(ordered, n=4, method='inclusive') if n > 1 else ordered * 3
+    # distribution-free interval for the median from order statistics (binomial, normal approximation)
+    half = Z_95 * math.sqrt(n) / 2
+    low = ordered[max(0, math.floor(n / 2 - half) - 1)]
+    high = ordered[min(n - 1, math.ceil(n / 2 + half))]
+    seconds = lambda ns: ns / 1e9
+    return {
+        'median_s': seconds(median),
+        'mean_s': seconds(statistics.fmean(ordered)),
+        'min_s': seconds(ordered[0]),
+        'q1_s': seconds(q1),
+        'q3_s': seconds(q3),
+        'iqr_s': seconds(q3 - q1),
+        'ci_low_s': seconds(low),
+        'ci_high_s': seconds(high),
+        'stdev_s': seconds(statistics.stdev(ordered)) if n > 1 else 0.0,
+    }
+
+def benchmark_cell(name, func, data, prepare=list, repeats=None, warmup=WARMUP, target_time=TARGET_TIME_S,
+                   min_repeats=MIN_REPEATS, max_repeats=MAX_REPEATS, verify=True, memory=False):
+    # the first run checks the output and doubles as the first warmup run
+    elapsed, output = run_once(func, prepare, data)
+    if verify and not sorts_input(output, data):
+        raise AssertionError(f"{name} did not sort its input of size {len(data)}")
+    times = [] if warmup else [elapsed]
+    for _ in range(warmup - 1):
+        elapsed, _ = run_once(func, prepare, data)
+    if repeats is None:
+        repeats = calibrate(elapsed, target_time, min_repeats, max_repeats)
+    while len(times) < repeats:
+        times.append(run_once(func, prepare, data)[0])
+    record = {'algorithm': name, 'size': len(data), 'repeats': repeats, 'warmup': warmup, **summarize(times)}
+    if memory:
+        # a separate run: tracemalloc slows allocations down too much to time under it
+        record['peak_bytes'] = peak_memory(func, prepare, data)
+    return record
+
+def benchmark(algorithms, sizes, prepare=None, seed=0, progress=None, **options):
+    # algorithms: name -> sort function; prepare: name -> input adapter (default: list copy).
+    # options go to benchmark_cell (repeats, warmup, target_time, min/max_repeats, verify, memory).
+    prepare = prepare or {}
+    records = []
+    for size in sizes:
+        data = make_input(size, seed)
+        for name, func in algorithms.items():
+            record = benchmark_cell(name, func, data, prepare.get(name, list), **options)
+            record['seed'] = seed
+            records.append(record)
+            if progress:
+                progress(record)
+    return records
+
+class CellTimeout(Exception):
+    pass
+
+def _raise_timeout(signum, frame):
+    raise CellTimeout()
+
+@contextlib.contextmanager
+def time_limit(seconds):
+    # SIGALRM interrupts the sort wherever it is; without it (Windows) cells run unbounded
+    if not seconds or not hasattr(signal, 'setitimer'):
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def available_cpus():
+    return sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+
+def load_registry():
+    import sort_times_compare
+    return sort_times_compare.ALGORITHMS, sort_times_compare.PREPARE
+
+def init_worker(cpus, counter):
+    # each worker takes the next CPU of the list and stays on it
+    global _registry, _prepare, _cpu
+    _registry, _prepare = load_registry()
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+    _cpu = cpus[slot % len(cpus)]
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {_cpu})
+
+def run_cell(name, size, seed, timeout, options):
+    start = time.perf_counter()
+    try:
+        with time_limit(timeout):
+            record = benchmark_cell(name, _registry[name], make_input(size, seed), _prepare.get(name, list), **options)
+        record['status'] = 'ok'
+    except CellTimeout:
+        record = {'algorithm': name, 'size': size, 'status': 'skipped', 'reason': f"timeout after {timeout}s"}
+    except Exception as e:
+        # recorded instead of raised, so the other cells carry on; resuming runs it again
+        record = {'algorithm': name, 'size': size, 'status': 'error', 'reason': f"{type(e).__name__}: {e}"}
+    record.update(seed=seed, cpu=_cpu, pid=os.getpid(), wall_s=time.perf_counter() - start)
+    return record
+
+def estimate_costs(names, sizes, registry, prepare, seed=0):
+    # time each algorithm at two pilot sizes and extrapolate with the fitted exponent,
+    # so quadratic sorts at large sizes go first
+    costs = {}
+    for name in names:
+        small, large = (run_once(registry[name], prepare.get(name, list), make_input(n, seed))[0] for n in PILOT_SIZES)
+        exponent = min(3.0, max(1.0, math.log(max(large, 1) / max(small, 1)) / math.log(PILOT_SIZES[1] / PILOT_SIZES[0])))
+        for size in sizes:
+            costs[name, size] = large * (size / PILOT_SIZES[1]) ** exponent
+    return costs
+
+def read_checkpoint(path):
+    # finished cells from an earlier run; a line cut short by an interruption is ignored,
+    # and cells that timed out or failed are run again (possibly under a larger limit)
+    done = {}
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('status') == 'ok':
+                    done[record['algorithm'], record['size'], record['seed']] = record
+    return done
+
+def run_matrix(names, sizes, seed=0, workers=None, timeout=None, checkpoint=None, progress=None, **options):
+    # Every (algorithm, size) cell as one task, longest predicted first, on a process
+    # pool whose workers are pinned to distinct CPUs. Finished cells are appended to
+    # the checkpoint (JSON lines) and skipped when the run is started again; a cell
+    # running past `timeout` seconds is recorded as skipped, one that raises as error.
+    global _registry, _prepare
+    cpus = available_cpus()
+    workers = workers or len(cpus)
+    if workers > len(cpus):
+        raise ValueError(f"{workers} workers need as many CPUs to be pinned to, only {len(cpus)} are available.")
+    done = read_checkpoint(checkpoint)
+    records = [done[name, size, seed] for size in sizes for name in names if (name, size, seed) in done]
+    todo = [(name, size) for size in sizes for name in names if (name, size, seed) not in done]
+
+    registry, prepare = load_registry()
+    costs = estimate_costs(sorted({name for name, _ in todo}), sizes, registry, prepare, seed)
+    todo.sort(key=lambda cell: costs[cell], reverse=True)
+
+    def finish(record):
+        records.append(record)
+        if checkpoint:
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+        if progress:
+            progress(record)
+
+    with open(checkpoint, 'a', encoding='utf-8') if checkpoint else contextlib.nullcontext() as out:
+        if workers == 1:
+            _registry, _prepare = registry, prepare
+            for name, size in todo:
+                finish(run_cell(name, size, seed, timeout, options))
+        else:
+            counter = multiprocessing.Value('i', 0)
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cpus, counter)) as pool:
+                futures = [pool.submit(run_cell, name, size, seed, timeout, options) for name, size in todo]
+                try:
+                    for future in as_completed(futures):
+                        finish(future.result())
+                except BaseException:
+                    # a crashed worker or an interrupt: drop the queued cells instead of waiting for them
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+    return records
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+def write_results(records, path, settings=None):
+    # .csv gets one row per cell, anything else a JSON report with the environment
+    if path.lower().endswith('.csv'):
+        fieldnames = list(dict.fromkeys(key for record in records for key in record))
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(records)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'settings': settings or {}, 'results': records}, f, indent=2)
+
+def plot_results(records, path=None):
+    # median per size with the IQR as a band; matplotlib is only imported here
+    import matplotlib
+    if path:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 5))
+    for name in dict.fromkeys(record['algorithm'] for record in records):
+        rows = sorted((r for r in records if r['algorithm'] == name and 'median_s' in r), key=lambda r: r['size'])
+        sizes = [r['size'] for r in rows]
+        plt.plot(sizes, [r['median_s'] for r in rows], marker='o', label=name)
+        plt.fill_between(sizes, [r['q1_s'] for r in rows], [r['q3_s'] for r in rows], alpha=0.2)
+    plt.xlabel("Size of Array")
+    plt.ylabel("Median Time (seconds)")
+    plt.title("Sorting Algorithm Performance (median, IQR band)")
+    plt.legend()
+    plt.grid()
+    if path:
+        plt.savefig(path, dpi=120, bbox_inches='tight')
+    else:
+        plt.show()
+
+def slug(name):
+    return name.lower().replace(' ', '-')
+
+def select(registry, names):
+    # pick algorithms by their table name or its slug ("Merge Sort" or merge-sort)
+    if not names:
+        return dict(registry)
+    by_slug = {slug(name): name for name in registry}
+    selected = {}
+    for name in names:
+        key = name if name in registry else by_slug.get(slug(name))
+        if key is None:
+            raise SystemExit(f"Unknown algorithm {name!r}, expected one of {', '.join(by_slug)}.")
+        selected[key] = registry[key]
+    return selected
+
+def main(argv=None):
+    import sort_times_compare
+
+    parser = argparse.ArgumentParser(description="Time the sorting lab's algorithms on shared seeded inputs.")
+    parser.add_argument('--sizes', nargs='+', type=int, default=sort_times_compare.SIZES)
+    parser.add_argument('--algorithms', nargs='+', help="names or slugs, e.g. merge-sort (default: all)")
+    parser.add_argument('--repeats', type=int, help="fixed repeats per cell (default: calibrated)")
+    parser.add_argument('--target-time', type=float, default=TARGET_TIME_S, help="seconds of measurement per cell")
+    parser.add_argument('--min-repeats', type=int, default=MIN_REPEATS)
+    parser.add_argument('--max-repeats', type=int, default=MAX_REPEATS)
+    parser.add_argument('--warmup', type=int, default=WARMUP)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-verify', action='store_true', help="skip checking that the output is sorted")
+    parser.add_argument('--memory', action='store_true', help="also record each sort's peak allocation (tracemalloc)")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes, each pinned to one CPU (0: one per CPU)")
+    parser.add_argument('--timeout', type=float, help="seconds per cell before it is marked skipped")
+    parser.add_argument('--checkpoint', help="JSON lines file of finished cells, reused to resume a run")
+    parser.add_argument('--output', default='sort_results.json', help=".json or .csv")
+    parser.add_argument('--plot', nargs='?', const='', help="plot the medians, to this file if given")
+    args = parser.parse_args(argv)
+    if args.workers > len(available_cpus()):
+        parser.error(f"--workers {args.workers} exceeds the {len(available_cpus())} CPUs available to pin workers to")
+
+    algorithms = select(sort_times_compare.ALGORITHMS, args.algorithms)
+    records = run_matrix(list(algorithms), args.sizes, args.seed, args.workers, args.timeout, args.checkpoint,
+                         progress=lambda record: print(json.dumps(record)),
+                         repeats=args.repeats, warmup=args.warmup, target_time=args.target_time,
+                         min_repeats=args.min_repeats, max_repeats=args.max_repeats, verify=not args.no_verify,
+                         memory=args.memory)
+    records.sort(key=lambda record: (record['size'], list(algorithms).index(record['algorithm'])))
+    write_results(records, args.output, vars(args))
+    print(f"Results written to {args.output}")
+    if args.plot is not None:
+        plot_results(records, args.plot or None)
+
+if __name__ == '__main__':
+    sys.exit(main())
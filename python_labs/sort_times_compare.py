@@ -1,8 +1,7 @@
-import time
-import random
+from bisect import bisect_left, bisect_right
 import pandas as pd
-import matplotlib.pyplot as plt
-from tabulate import tabulate
+from array_sorts import counting_sort, int64_array, numpy_array, numpy_sort, radix_sort
+from sort_benchmark import benchmark
 
 
 def bubble_sort(arr):
@@ -47,6 +46,121 @@ def merge_sort(arr):
             k += 1
 
 
+# Natural merge sort (Timsort style): ascending and strictly descending runs are
+# found in one scan, short runs are extended to MIN_RUN with binary insertion,
+# then runs are merged pairwise bottom-up through one buffer allocated up front.
+MIN_RUN = 32
+MIN_GALLOP = 7
+
+
+def _reverse(arr, lo, hi):
+    hi -= 1
+    while lo < hi:
+        arr[lo], arr[hi] = arr[hi], arr[lo]
+        lo += 1
+        hi -= 1
+
+
+def _binary_insertion_sort(arr, lo, start, hi):
+    # arr[lo:start] is sorted already
+    for i in range(start, hi):
+        key = arr[i]
+        pos = bisect_right(arr, key, lo, i)
+        for j in range(i, pos, -1):
+            arr[j] = arr[j - 1]
+        arr[pos] = key
+
+
+def _gallop(a, x, start, end, right):
+    # end of the leading a[start:end] elements that are < x (<= x if right), probing 1, 2, 4, ... ahead first
+    step = 1
+    while start + step <= end and (not x < a[start + step - 1] if right else a[start + step - 1] < x):
+        step *= 2
+    search = bisect_right if right else bisect_left
+    return search(a, x, start + step // 2, min(end, start + step))
+
+
+def _merge(arr, buf, lo, mid, hi):
+    # left elements already <= arr[mid] and right elements already >= arr[mid - 1] stay put
+    lo = bisect_right(arr, arr[mid], lo, mid)
+    hi = bisect_left(arr, arr[mid - 1], mid, hi)
+    if lo == mid or mid == hi:
+        return
+    left_end = mid - lo
+    for t in range(left_end):
+        buf[t] = arr[lo + t]
+
+    i, j, k = 0, mid, lo
+    while i < left_end and j < hi:
+        # one at a time while the sides alternate...
+        left_wins = right_wins = 0
+        while i < left_end and j < hi and left_wins < MIN_GALLOP and right_wins < MIN_GALLOP:
+            if arr[j] < buf[i]:
+                arr[k] = arr[j]
+                j += 1
+                right_wins += 1
+                left_wins = 0
+            else:
+                arr[k] = buf[i]
+                i += 1
+                left_wins += 1
+                right_wins = 0
+            k += 1
+        if i == left_end or j == hi:
+            break
+        # ...then in whole stretches while one side keeps winning
+        end = _gallop(buf, arr[j], i, left_end, True)
+        for t in range(i, end):
+            arr[k] = buf[t]
+            k += 1
+        i = end
+        if i == left_end:
+            break
+        end = _gallop(arr, buf[i], j, hi, False)
+        for t in range(j, end):
+            arr[k] = arr[t]
+            k += 1
+        j = end
+
+    while i < left_end:
+        arr[k] = buf[i]
+        i += 1
+        k += 1
+
+
+def natural_merge_sort(arr):
+    n = len(arr)
+    if n < 2:
+        return
+    bounds = [0]
+    i = 0
+    while i < n:
+        j = i + 1
+        if j < n and arr[j] < arr[i]:
+            while j < n and arr[j] < arr[j - 1]:
+                j += 1
+            _reverse(arr, i, j)
+        else:
+            while j < n and not arr[j] < arr[j - 1]:
+                j += 1
+        if j - i < MIN_RUN and j < n:
+            end = min(n, i + MIN_RUN)
+            _binary_insertion_sort(arr, i, j, end)
+            j = end
+        bounds.append(j)
+        i = j
+
+    buf = [None] * n
+    while len(bounds) > 2:
+        merged = [0]
+        for r in range(0, len(bounds) - 2, 2):
+            _merge(arr, buf, bounds[r], bounds[r + 1], bounds[r + 2])
+            merged.append(bounds[r + 2])
+        if len(bounds) % 2 == 0:
+            merged.append(bounds[-1])
+        bounds = merged
+
+
 def quick_sort(arr):
     if len(arr) <= 1:
         return arr
@@ -57,53 +171,141 @@ def quick_sort(arr):
     return quick_sort(left) + middle + quick_sort(right)
 
 
-def measure_time(sort_function, arr):
-    start_time = time.time()
-    sort_function(arr)
-    return time.time() - start_time
-
-
-def run_experiment(repeats=5):
-    sizes = [100, 500, 1000, 5000]
-    results = []
-    algorithms = {
-        "Bubble Sort": bubble_sort,
-        "Insertion Sort": insertion_sort,
-        "Merge Sort": merge_sort,
-        "Quick Sort": quick_sort
-    }
-
-    for size in sizes:
-        for name, func in algorithms.items():
-            times = []
-            for _ in range(repeats):
-                arr = random.sample(range(size * 10), size)
-                arr_copy = arr.copy()
-                if name == "Quick Sort":
-                    exec_time = measure_time(lambda x: quick_sort(x), arr_copy)
+# Introsort: in-place quicksort with median-of-three (ninther for large ranges)
+# pivots and three-way partitioning, heapsort once a range has been split more
+# than 2*log2(n) times, and one insertion sort pass over the small leftovers.
+INSERTION_CUTOFF = 16
+NINTHER_CUTOFF = 40
+
+
+def _median_of_three(arr, a, b, c):
+    if arr[a] < arr[b]:
+        if arr[b] < arr[c]:
+            return b
+        return c if arr[a] < arr[c] else a
+    if arr[a] < arr[c]:
+        return a
+    return c if arr[b] < arr[c] else b
+
+
+def _choose_pivot(arr, lo, hi):
+    mid = (lo + hi) // 2
+    if hi - lo <= NINTHER_CUTOFF:
+        return _median_of_three(arr, lo, mid, hi - 1)
+    step = (hi - lo) // 8
+    return _median_of_three(arr,
+                            _median_of_three(arr, lo, lo + step, lo + 2 * step),
+                            _median_of_three(arr, mid - step, mid, mid + step),
+                            _median_of_three(arr, hi - 1 - 2 * step, hi - 1 - step, hi - 1))
+
+
+def _sift_down(arr, lo, root, end):
+    # max-heap over arr[lo:end], root and children as offsets from lo
+    item = arr[lo + root]
+    child = 2 * root + 1
+    while child < end - lo:
+        if child + 1 < end - lo and arr[lo + child] < arr[lo + child + 1]:
+            child += 1
+        if not item < arr[lo + child]:
+            break
+        arr[lo + root] = arr[lo + child]
+        root = child
+        child = 2 * root + 1
+    arr[lo + root] = item
+
+
+def _heap_sort(arr, lo, hi):
+    for root in range((hi - lo) // 2 - 1, -1, -1):
+        _sift_down(arr, lo, root, hi)
+    for end in range(hi - 1, lo, -1):
+        arr[lo], arr[end] = arr[end], arr[lo]
+        _sift_down(arr, lo, 0, end)
+
+
+def intro_sort(arr):
+    n = len(arr)
+    if n < 2:
+        return
+    stack = [(0, n, 2 * n.bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while hi - lo > INSERTION_CUTOFF:
+            if depth == 0:
+                _heap_sort(arr, lo, hi)
+                break
+            depth -= 1
+            pivot = arr[_choose_pivot(arr, lo, hi)]
+            # arr[lo:lt] < pivot, arr[lt:i] == pivot, arr[gt:hi] > pivot
+            lt, i, gt = lo, lo, hi
+            while i < gt:
+                x = arr[i]
+                if x < pivot:
+                    arr[i] = arr[lt]
+                    arr[lt] = x
+                    lt += 1
+                    i += 1
+                elif pivot < x:
+                    gt -= 1
+                    arr[i] = arr[gt]
+                    arr[gt] = x
                 else:
-                    exec_time = measure_time(func, arr_copy)
-                times.append(exec_time)
-            avg_time = sum(times) / len(times)
-            results.append([size, name, avg_time])
+                    i += 1
+            # keep the larger side for later and go on with the smaller one, so the stack stays O(log n)
+            if lt - lo < hi - gt:
+                stack.append((gt, hi, depth))
+                hi = lt
+            else:
+                stack.append((lo, lt, depth))
+                lo = gt
+    insertion_sort(arr)
+
+
+SIZES = [100, 500, 1000, 5000]
+
+# Algorithm table used by run_experiment and sort_benchmark: in-place sorts
+# return None, the others return the sorted list
+ALGORITHMS = {
+    "Bubble Sort": bubble_sort,
+    "Insertion Sort": insertion_sort,
+    "Merge Sort": merge_sort,
+    "Natural Merge Sort": natural_merge_sort,
+    "Quick Sort": quick_sort,
+    "Intro Sort": intro_sort,
+    "Radix Sort": radix_sort,
+    "Counting Sort": counting_sort,
+    "NumPy Sort": numpy_sort
+}
+# Untimed hook turning the shared input into what a sort takes (default: a list copy)
+PREPARE = {
+    "Radix Sort": int64_array,
+    "Counting Sort": int64_array,
+    "NumPy Sort": numpy_array
+}
+
 
-    df = pd.DataFrame(results, columns=["Size", "Algorithm", "Avg Time (s)"])
+def run_experiment(repeats=5, sizes=SIZES, algorithms=None, seed=0):
+    # every algorithm sorts the same seeded input of each size, after one warmup run
+    records = benchmark(algorithms or ALGORITHMS, sizes, PREPARE, seed, repeats=repeats)
+    df = pd.DataFrame(records).rename(columns={"size": "Size", "algorithm": "Algorithm", "mean_s": "Avg Time (s)"})
     return df.pivot(index="Size", columns="Algorithm", values="Avg Time (s)")
 
 
-df_results = run_experiment()
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+    from tabulate import tabulate
 
+    df_results = run_experiment()
 
-print("\n=== AVG SORT TIMES ===\n")
-print(tabulate(df_results, headers='keys', tablefmt='fancy_grid', floatfmt=".6f"))
+    print("\n=== AVG SORT TIMES ===\n")
+    print(tabulate(df_results, headers='keys', tablefmt='fancy_grid', floatfmt=".6f"))
 
-# Wykres
-plt.figure(figsize=(10, 5))
-for algo in df_results.columns:
-    plt.plot(df_results.index, df_results[algo], marker='o', label=algo)
-plt.xlabel("Size of Array")
-plt.ylabel("Avg Time (seconds)")
-plt.title("Sorting Algorithm Performance (Averaged)")
-plt.legend()
-plt.grid()
-plt.show()
+    # Wykres
+    plt.figure(figsize=(10, 5))
+    for algo in df_results.columns:
+        plt.plot(df_results.index, df_results[algo], marker='o', label=algo)
+    plt.xlabel("Size of Array")
+    plt.ylabel("Avg Time (seconds)")
+    plt.title("Sorting Algorithm Performance (Averaged)")
+    plt.legend()
+    plt.grid()
+    plt.show()
@@ -0,0 +1,170 @@
+import argparse
+import csv
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os import path
+import cv2
+import numpy as np
+import codec
+import lab2
+import lab3
+
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg', '.bmp')
+# lossy formats would destroy the LSBs, so embedded copies are written as PNG
+LOSSLESS_EXTENSIONS = ('.png', '.bmp')
+SCHEMES = ('lab2', 'lab3')
+
+
+def items_from_directory(directory, payload=None, key=None):
+    images = sorted(f for f in os.listdir(directory) if f.lower().endswith(IMAGE_EXTENSIONS))
+    return [{'image': path.join(directory, f), 'payload': payload, 'key': key} for f in images]
+
+def items_from_manifest(manifest):
+    # CSV with an "image" column and optional "payload"/"key" columns, or JSON lines with the same fields
+    base = path.dirname(path.abspath(manifest))
+    with open(manifest, newline='', encoding='utf-8') as f:
+        if manifest.endswith(('.jsonl', '.json')):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    items = []
+    for row in rows:
+        image = row['image']
+        items.append({
+            'image': image if path.isabs(image) else path.join(base, image),
+            'payload': row.get('payload') or None,
+            'key': row.get('key') if row.get('key') not in ('', None) else None,
+        })
+    return items
+
+def output_path(img_path, output_dir=None):
+    filename, ext = path.splitext(img_path)
+    if ext.lower() not in LOSSLESS_EXTENSIONS:
+        ext = '.png'
+    filename += '_lsb_embedded' + ext
+    if output_dir:
+        filename = path.join(output_dir, path.basename(filename))
+    return filename
+
+def seed_for(scheme, key):
+    if scheme != 'lab3':
+        return None
+    if key is None:
+        raise ValueError("lab3 items need an integer key.")
+    return int(key)
+
+def init_worker():
+    # one image per process, so OpenCV's own thread pool would only oversubscribe the cores
+    cv2.setNumThreads(1)
+
+def embed_item(item, scheme, output_dir=None):
+    timings = {}
+    start = time.perf_counter()
+    img = cv2.imread(item['image'], cv2.IMREAD_ANYCOLOR)
+    if img is None:
+        raise FileNotFoundError("Image not found. Check the file path.")
+    timings['decode_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if item['payload'] is None:
+        raise ValueError("No payload to embed.")
+    payload = codec.to_bytes(item['payload'])
+    if len(lab2.frame(payload)) > lab2.capacity(img.shape):
+        raise ValueError(f"Message too large. Max capacity: {lab2.capacity(img.shape)} characters.")
+    data = np.reshape(img, -1)
+    seed = seed_for(scheme, item['key'])
+    if scheme == 'lab3':
+        lab3.embed_payload(data, payload, seed)
+    else:
+        lab2.embed_payload(data, payload)
+    timings['embed_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    filename = output_path(item['image'], output_dir)
+    if not cv2.imwrite(filename, img):
+        raise OSError(f"Could not write {filename}")
+    timings['encode_s'] = time.perf_counter() - start
+    return {'output': filename, 'payload_bytes': len(payload)}, timings
+
+def extract_item(item, scheme, output_dir=None):
+    timings = {}
+    start = time.perf_counter()
+    img = cv2.imread(item['image'], cv2.IMREAD_ANYCOLOR)
+    if img is None:
+        raise FileNotFoundError("Image not found. Check the file path.")
+    timings['decode_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = np.reshape(img, -1)
+    if scheme == 'lab3':
+        payload = lab3.extract_payload(data, seed_for(scheme, item['key']))
+    else:
+        payload = lab2.extract_payload(data)
+    timings['extract_s'] = time.perf_counter() - start
+
+    result = {'payload': codec.to_text(payload), 'payload_bytes': len(payload)}
+    if item['payload'] is not None:
+        result['match'] = payload == codec.to_bytes(item['payload'])
+    return result, timings
+
+def process_item(item, mode, scheme, output_dir=None):
+    record = {'image': item['image'], 'mode': mode, 'scheme': scheme, 'pid': os.getpid()}
+    start = time.perf_counter()
+    try:
+        handler = embed_item if mode == 'embed' else extract_item
+        result, timings = handler(item, scheme, output_dir)
+        record.update(result)
+        record.update(timings)
+        record['status'] = 'ok'
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        record['traceback'] = traceback.format_exc()
+    record['total_s'] = time.perf_counter() - start
+    return record
+
+def run_batch(items, mode, scheme='lab2', results_path='results.jsonl', workers=None, output_dir=None):
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown scheme {scheme!r}, expected one of {SCHEMES}.")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    summary = {'items': len(items), 'ok': 0, 'error': 0}
+    start = time.perf_counter()
+    with open(results_path, 'w', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        futures = [pool.submit(process_item, item, mode, scheme, output_dir) for item in items]
+        # records are written as soon as each item finishes, not in submission order
+        for future in as_completed(futures):
+            record = future.result()
+            summary[record['status']] += 1
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    summary['wall_s'] = time.perf_counter() - start
+    return summary
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Embed or extract LSB messages for many images in parallel.")
+    parser.add_argument('mode', choices=('embed', 'extract'))
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--dir', help="process every image in this directory")
+    source.add_argument('--manifest', help="CSV or JSON lines file with image, payload and key fields")
+    parser.add_argument('--payload', help="payload for --dir items (embed) or expected payload (extract)")
+    parser.add_argument('--key', help="permutation key for --dir items (lab3)")
+    parser.add_argument('--scheme', choices=SCHEMES, default='lab2')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--output-dir', help="where embedded images go (default: next to the input)")
+    parser.add_argument('--results', default='results.jsonl', help="per-item JSON lines results file")
+    args = parser.parse_args()
+    if args.mode == 'embed' and args.dir and args.payload is None:
+        parser.error("embedding with --dir needs --payload")
+
+    if args.dir:
+        batch_items = items_from_directory(args.dir, args.payload, args.key)
+    else:
+        batch_items = items_from_manifest(args.manifest)
+
+    print(json.dumps(run_batch(batch_items, args.mode, args.scheme, args.results, args.workers, args.output_dir)))
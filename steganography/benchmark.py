@@ -0,0 +1,222 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+import wave
+import cv2
+import numpy as np
+import codec
+import lab2
+import lab3
+import lab4
+import lab5
+import lab6
+
+# Offline benchmark for the steganography labs: synthetic carriers only,
+# embed and extract timed separately, results written as JSON.
+
+IMAGE_SIZES = {'vga': (480, 640), 'fullhd': (1080, 1920), '4k': (2160, 3840)}
+AUDIO_SECONDS = (10, 60)
+SAMPLE_RATE = 44100
+LAB3_KEY = 1234
+LAB4_KEY = 4321
+
+
+def random_image(shape, rng):
+    return rng.integers(0, 256, shape, dtype=np.uint8)
+
+def natural_image(shape, rng):
+    # smooth gradients and low-frequency texture plus mild sensor noise
+    height, width = shape[:2]
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = 128 + 60 * np.sin(x / width * 3 * np.pi) * np.cos(y / height * 2 * np.pi)
+    texture = cv2.GaussianBlur(rng.normal(0, 40, (height, width)).astype(np.float32), (0, 0), 6)
+    img = base + texture + rng.normal(0, 3, (height, width))
+    if len(shape) == 3:
+        img = np.stack([img + 15 * c for c in range(shape[2])], axis=-1)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+IMAGE_KINDS = {'random': random_image, 'natural': natural_image}
+
+def write_wav(filename, seconds, rng, channels=2):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = 8000 * np.sin(2 * np.pi * 440 * t) + 3000 * np.sin(2 * np.pi * 1250 * t)
+    samples = np.stack([tone + rng.normal(0, 500, t.size) for _ in range(channels)], axis=-1)
+    with wave.open(filename, 'wb') as wav_out:
+        wav_out.setnchannels(channels)
+        wav_out.setsampwidth(2)
+        wav_out.setframerate(SAMPLE_RATE)
+        wav_out.writeframes(np.clip(samples, -32768, 32767).astype('<i2').tobytes())
+
+def bit_error_rate(expected, actual):
+    expected, actual = codec.to_bits(expected), codec.to_bits(actual)
+    common = min(expected.size, actual.size)
+    errors = np.count_nonzero(expected[:common] != actual[:common]) + abs(expected.size - actual.size)
+    return errors / max(expected.size, 1)
+
+def timed(func, repeats):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def quiet(func):
+    def wrapper(*args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args, **kwargs)
+    return wrapper
+
+# Every scheme case returns (carrier_bytes, capacity_bits, payload, embed, extract);
+# embed() prepares the stego carrier and extract() returns the recovered payload bytes.
+
+def lab2_case(img, fill, rng, workdir):
+    flat = img.reshape(-1)
+    capacity_bits = lab2.capacity(img.shape) * 8
+    payload = rng.bytes(max(1, int(lab2.capacity(img.shape) * fill) - 16))
+    stego = flat.copy()
+
+    def embed():
+        stego[:] = flat
+        lab2.embed_payload(stego, payload)
+    return flat.nbytes, capacity_bits, payload, embed, lambda: lab2.extract_payload(stego)
+
+def lab3_case(img, fill, rng, workdir):
+    flat = img.reshape(-1)
+    capacity_bits = lab2.capacity(img.shape) * 8
+    payload = rng.bytes(max(1, int(lab2.capacity(img.shape) * fill) - 16))
+    stego = flat.copy()
+
+    def embed():
+        stego[:] = flat
+        lab3.embed_payload(stego, payload, LAB3_KEY)
+    return flat.nbytes, capacity_bits, payload, embed, lambda: lab3.extract_payload(stego, LAB3_KEY)
+
+def lab4_case(img, fill, rng, workdir, r=9):
+    # lab4 only has a file API, so its timings include PNG encode/decode
+    if img.ndim != 3:
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    src, dst = os.path.join(workdir, 'lab4_in.png'), os.path.join(workdir, 'lab4_out.png')
+    cv2.imwrite(src, img)
+    h, w = img.shape[:2]
+    capacity_bits = (h - 2) * (w - 2) // r
+    payload = rng.bytes(max(1, int(capacity_bits * fill) // 8))
+
+    embed = lambda: quiet(lab4.embed_message)(src, payload, dst, r=r, key=LAB4_KEY)
+    extract = lambda: lab4.extract_payload(dst, None, len(payload), r=r, key=LAB4_KEY)
+    return img.nbytes, capacity_bits, payload, embed, extract
+
+def lab5_case(img, fill, rng, workdir):
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    gray = gray[:gray.shape[0] - gray.shape[0] % 8, :gray.shape[1] - gray.shape[1] % 8]
+    capacity_bits = lab5.block_count(gray.shape)
+    payload_bytes = max(1, int(capacity_bits * fill) // 8 - codec.HEADER.size - codec.CRC.size)
+    payload = rng.bytes(payload_bytes)
+    stego = {}
+
+    def embed():
+        stego['img'] = np.clip(lab5.embed_message(gray, payload), 0, 255).astype(np.uint8)
+
+    def extract():
+        # read the raw framed bits, so a CRC failure still yields a bit error rate
+        bits = lab5.extract_data(stego['img'], len(codec.frame(payload, crc=True)) * 8)
+        return codec.from_bits(bits)[codec.HEADER.size:codec.HEADER.size + len(payload)]
+    return gray.nbytes, capacity_bits, payload, embed, extract
+
+def lab6_case(seconds, fill, rng, workdir):
+    src, dst = os.path.join(workdir, 'lab6_in.wav'), os.path.join(workdir, 'lab6_out.wav')
+    write_wav(src, seconds, rng)
+    capacity_bits = int(seconds * SAMPLE_RATE) * 2 - 8
+    # the terminator makes zero bytes ambiguous, so the payload avoids them
+    payload = bytes(rng.integers(1, 256, max(1, int(capacity_bits * fill) // 8), dtype=np.uint8))
+    embed = lambda: lab6.hide_message_lsb(src, dst, payload)
+    extract = lambda: lab6.extract_payload_lsb(dst)
+    return os.path.getsize(src), capacity_bits, payload, embed, extract
+
+IMAGE_SCHEMES = {'lab2': lab2_case, 'lab3': lab3_case, 'lab4': lab4_case, 'lab5': lab5_case}
+
+def measure(scheme, carrier, case, repeats):
+    carrier_bytes, capacity_bits, payload, embed, extract = case
+    embed_s, _ = timed(embed, repeats)
+    extract_s, recovered = timed(extract, repeats)
+    megabytes = carrier_bytes / 1e6
+    return {
+        'scheme': scheme,
+        'carrier': carrier,
+        'carrier_bytes': carrier_bytes,
+        'capacity_bits': capacity_bits,
+        'payload_bytes': len(payload),
+        'embed_s': embed_s,
+        'extract_s': extract_s,
+        'embed_mb_s': megabytes / embed_s,
+        'extract_mb_s': megabytes / extract_s,
+        'embed_peak_bytes': peak_memory(embed),
+        'extract_peak_bytes': peak_memory(extract),
+        'bit_error_rate': bit_error_rate(payload, recovered),
+    }
+
+def run_benchmark(schemes, sizes, kinds, seconds, fill=0.5, repeats=3, seed=0):
+    rng = np.random.default_rng(seed)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            for kind in kinds:
+                img = IMAGE_KINDS[kind](IMAGE_SIZES[size] + (3,), rng)
+                for scheme in schemes:
+                    if scheme not in IMAGE_SCHEMES:
+                        continue
+                    case = IMAGE_SCHEMES[scheme](img, fill, rng, workdir)
+                    results.append(measure(scheme, f'{kind}-{size}', case, repeats))
+                    print(json.dumps(results[-1]))
+        if 'lab6' in schemes:
+            for duration in seconds:
+                case = lab6_case(duration, fill, rng, workdir)
+                results.append(measure('lab6', f'wav-{duration}s', case, repeats))
+                print(json.dumps(results[-1]))
+    return results
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Throughput, memory, capacity and BER benchmark for lab2-lab6.")
+    parser.add_argument('--schemes', nargs='+', default=list(IMAGE_SCHEMES) + ['lab6'])
+    parser.add_argument('--sizes', nargs='+', choices=IMAGE_SIZES, default=['vga', 'fullhd'])
+    parser.add_argument('--kinds', nargs='+', choices=IMAGE_KINDS, default=list(IMAGE_KINDS))
+    parser.add_argument('--seconds', nargs='+', type=float, default=list(AUDIO_SECONDS))
+    parser.add_argument('--fill', type=float, default=0.5, help="payload size as a fraction of capacity")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    report = {
+        'environment': environment(),
+        'settings': vars(args),
+        'results': run_benchmark(args.schemes, args.sizes, args.kinds, args.seconds,
+                                 args.fill, args.repeats, args.seed),
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
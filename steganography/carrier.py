@@ -0,0 +1,137 @@
+import fcntl
+import os
+import shutil
+import struct
+from collections import namedtuple
+import numpy as np
+
+# Memory-mapped access to the pixel bytes of uncompressed BMP/PPM/PGM files.
+# Pixels are addressed in the same flat order as np.reshape(cv2.imread(...), -1)
+# (top-down rows, BGR channels), so the LSB schemes can run on either backend
+# and files written by one can be read by the other.
+
+MAPPABLE_EXTENSIONS = ('.bmp', '.ppm', '.pgm')
+FICLONE = 0x40049409
+
+Layout = namedtuple('Layout', 'width height channels offset stride bottom_up rgb')
+
+
+def read_bmp_layout(f):
+    header = f.read(54)
+    if len(header) < 54 or header[:2] != b'BM':
+        return None
+    offset, = struct.unpack_from('<I', header, 10)
+    dib_size, width, height, planes, bpp, compression = struct.unpack_from('<IiiHHI', header, 14)
+    # only plain 24-bit BI_RGB bitmaps have a palette-free BGR layout that matches cv2
+    if dib_size < 40 or bpp != 24 or compression != 0 or width <= 0 or height == 0:
+        return None
+    stride = (width * 3 + 3) // 4 * 4
+    return Layout(width, abs(height), 3, offset, stride, height > 0, False)
+
+def read_pnm_layout(f):
+    head = f.read(1024)
+    if head[:2] not in (b'P5', b'P6'):
+        return None
+    channels = 3 if head[:2] == b'P6' else 1
+
+    fields = []
+    pos = 2
+    while len(fields) < 3:
+        while pos < len(head) and head[pos:pos + 1].isspace():
+            pos += 1
+        if head[pos:pos + 1] == b'#':
+            # a comment running past the bytes read is left to cv2
+            pos = head.find(b'\n', pos) + 1
+            if not pos:
+                return None
+            continue
+        end = pos
+        while end < len(head) and head[end:end + 1].isdigit():
+            end += 1
+        if end == pos or end == len(head):
+            return None
+        fields.append(int(head[pos:end]))
+        pos = end
+
+    width, height, maxval = fields
+    if maxval > 255:
+        return None
+    # exactly one whitespace byte separates the header from the raster
+    return Layout(width, height, channels, pos + 1, width * channels, False, channels == 3)
+
+def read_layout(filename):
+    if not filename.lower().endswith(MAPPABLE_EXTENSIONS) or not os.path.isfile(filename):
+        return None
+    with open(filename, 'rb') as f:
+        layout = read_bmp_layout(f)
+        if layout is None:
+            f.seek(0)
+            layout = read_pnm_layout(f)
+    if layout is None or layout.offset + layout.stride * layout.height > os.path.getsize(filename):
+        return None
+    return layout
+
+def is_mappable(filename):
+    return read_layout(filename) is not None
+
+def copy_file(src, dst):
+    # reflink (copy-on-write) where the filesystem supports it, otherwise a kernel-side
+    # copy (shutil.copyfile uses sendfile). That copy still reads and writes the whole
+    # carrier, so writing to a new file is bound by disk bandwidth, not by the payload;
+    # only open_pixels(filename, writable=True), which patches in place, avoids it.
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            pass
+    shutil.copyfile(src, dst)
+
+class MappedPixels:
+    def __init__(self, filename, layout, mode='r'):
+        self.layout = layout
+        self.data = np.memmap(filename, dtype=np.uint8, mode=mode)
+        if layout.channels == 1:
+            self.shape = (layout.height, layout.width)
+        else:
+            self.shape = (layout.height, layout.width, layout.channels)
+        self.size = layout.height * layout.width * layout.channels
+
+    def __len__(self):
+        return self.size
+
+    def file_offsets(self, index):
+        if isinstance(index, slice):
+            index = np.arange(*index.indices(self.size))
+        index = np.asarray(index, dtype=np.int64)
+        if index.size and (index.min() < 0 or index.max() >= self.size):
+            raise IndexError("Pixel index out of range.")
+
+        layout = self.layout
+        row, col = np.divmod(index, layout.width * layout.channels)
+        if layout.bottom_up:
+            row = layout.height - 1 - row
+        if layout.rgb:
+            pixel, channel = np.divmod(col, layout.channels)
+            col = pixel * layout.channels + (layout.channels - 1 - channel)
+        return layout.offset + row * layout.stride + col
+
+    def __getitem__(self, index):
+        return np.asarray(self.data[self.file_offsets(index)])
+
+    def __setitem__(self, index, values):
+        self.data[self.file_offsets(index)] = values
+
+    def flush(self):
+        self.data.flush()
+
+def open_pixels(filename, output=None, writable=False):
+    # output=None maps the file read-only (or in place with writable=True);
+    # with an output path the carrier is cloned first and only the clone is touched
+    layout = read_layout(filename)
+    if layout is None:
+        raise ValueError(f"{filename} is not an uncompressed 24-bit BMP or 8-bit PPM/PGM.")
+    if output is not None and os.path.abspath(output) != os.path.abspath(filename):
+        copy_file(filename, output)
+        filename, writable = output, True
+    return MappedPixels(filename, layout, 'r+' if writable else 'r')
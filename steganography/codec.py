@@ -0,0 +1,60 @@
+import struct
+import zlib
+import numpy as np
+
+# Payload codec shared by the labs: payloads are bytes (str is UTF-8 encoded)
+# and bit streams are uint8 arrays of 0/1, most significant bit first.
+
+HEADER = struct.Struct('>IB')  # payload length in bytes, flags
+HEADER_BITS = HEADER.size * 8
+CRC = struct.Struct('>I')
+FLAG_CRC = 0x01
+
+
+def to_bytes(payload):
+    if isinstance(payload, str):
+        return payload.encode('utf-8')
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return payload
+    return bytes(payload)
+
+def to_text(data):
+    data = bytes(data)
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        # written by the older per-character code, one Latin-1 byte per char
+        return data.decode('latin-1')
+
+def to_bits(payload):
+    return np.unpackbits(np.frombuffer(to_bytes(payload), dtype=np.uint8))
+
+def from_bits(bits):
+    bits = np.asarray(bits, dtype=np.uint8)
+    return np.packbits(bits[:bits.size - bits.size % 8]).tobytes()
+
+def frame(payload, crc=False):
+    data = to_bytes(payload)
+    header = HEADER.pack(len(data), FLAG_CRC if crc else 0)
+    trailer = CRC.pack(zlib.crc32(data)) if crc else b''
+    return b''.join((header, data, trailer))
+
+def frame_length(header):
+    length, flags = HEADER.unpack(bytes(header[:HEADER.size]))
+    return HEADER.size + length + (CRC.size if flags & FLAG_CRC else 0)
+
+def unframe(framed):
+    framed = memoryview(to_bytes(framed))
+    if len(framed) < HEADER.size:
+        raise ValueError("Truncated frame header.")
+    length, flags = HEADER.unpack(framed[:HEADER.size])
+    end = HEADER.size + length
+    if len(framed) < frame_length(framed):
+        raise ValueError("Truncated frame payload.")
+
+    data = framed[HEADER.size:end].tobytes()
+    if flags & FLAG_CRC:
+        expected, = CRC.unpack(framed[end:end + CRC.size])
+        if zlib.crc32(data) != expected:
+            raise ValueError("CRC mismatch, the payload is corrupted.")
+    return data
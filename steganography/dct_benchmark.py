@@ -0,0 +1,83 @@
+import argparse
+import time
+import numpy as np
+from scipy.fftpack import dct, idct
+from lab5 import embed_data, extract_data, block_count
+
+
+# Reference: the original per-block pipeline (list of 8x8 copies, 4 fftpack calls per block)
+def legacy_embed(img, message_bits, alpha=100):
+    height, width = img.shape
+    blocks = [img[i:i+8, j:j+8].astype(np.float32)
+              for i in range(0, height, 8) for j in range(0, width, 8)]
+    embedded_blocks = []
+    for idx, block in enumerate(blocks):
+        dct_block = dct(dct(block.T, norm='ortho').T, norm='ortho')
+        if idx < len(message_bits):
+            x, y = 3, 4
+            if message_bits[idx] == '1':
+                dct_block[x, y] = dct_block[y, x] + alpha
+            else:
+                dct_block[x, y] = dct_block[y, x] - alpha
+        embedded_blocks.append(idct(idct(dct_block.T, norm='ortho').T, norm='ortho'))
+    out = np.zeros((height, width), dtype=np.float32)
+    idx = 0
+    for i in range(0, height, 8):
+        for j in range(0, width, 8):
+            out[i:i+8, j:j+8] = embedded_blocks[idx]
+            idx += 1
+    return out
+
+def legacy_extract(img, bit_count):
+    height, width = img.shape
+    bits = ''
+    idx = 0
+    for i in range(0, height, 8):
+        for j in range(0, width, 8):
+            if idx >= bit_count:
+                return bits
+            block = img[i:i+8, j:j+8].astype(np.float32)
+            dct_block = dct(dct(block.T, norm='ortho').T, norm='ortho')
+            bits += '1' if dct_block[3, 4] > dct_block[4, 3] else '0'
+            idx += 1
+    return bits
+
+def best_of(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def run(width, height, fill, repeats, seed):
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, (height, width), dtype=np.uint8)
+    bit_count = int(block_count(img.shape) * fill)
+    bits = rng.integers(0, 2, bit_count, dtype=np.uint8)
+    bit_string = (bits + ord('0')).tobytes().decode()
+    megapixels = width * height / 1e6
+
+    legacy_time, legacy_img = best_of(lambda: legacy_embed(img, bit_string), repeats)
+    batched_time, batched_img = best_of(lambda: embed_data(img, bits), repeats)
+    stego = np.clip(batched_img, 0, 255).astype(np.uint8)
+    legacy_extract_time, legacy_bits = best_of(lambda: legacy_extract(stego, bit_count), repeats)
+    batched_extract_time, batched_bits = best_of(lambda: extract_data(stego, bit_count), repeats)
+
+    print(f"Image {width}x{height}, {bit_count} payload bits ({fill:.0%} of blocks)")
+    print(f"Max abs difference vs legacy embed: {np.abs(legacy_img - batched_img).max():.4f}")
+    print(f"Extracted bits match legacy: {legacy_bits == (batched_bits + ord('0')).tobytes().decode()}")
+    for name, old, new in (("embed", legacy_time, batched_time),
+                           ("extract", legacy_extract_time, batched_extract_time)):
+        print(f"{name:8s} legacy {old:8.3f}s ({megapixels / old:8.2f} MP/s)   "
+              f"batched {new:8.3f}s ({megapixels / new:8.2f} MP/s)   speedup x{old / new:.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DCT embed/extract throughput: per-block loop vs batched blocks")
+    parser.add_argument('--width', type=int, default=3840)
+    parser.add_argument('--height', type=int, default=2160)
+    parser.add_argument('--fill', type=float, default=1.0, help="fraction of blocks carrying payload bits")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    run(args.width, args.height, args.fill, args.repeats, args.seed)
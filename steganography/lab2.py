@@ -4,6 +4,8 @@ import os
 from os import path
 import cv2
 import numpy as np
+import carrier
+from codec import to_bytes, to_text
 
 BITS = 2
 HIGH_BITS = 256 - (1 << BITS)
@@ -31,65 +33,91 @@ def list_images(directory):
         except ValueError:
             print("Please enter a valid number.")
 
-def insert(img_path, msg):
-    try:
-        img = cv2.imread(img_path, cv2.IMREAD_ANYCOLOR)
-        if img is None:
-            raise FileNotFoundError("Image not found. Check the file path.")
+SHIFTS = np.arange(0, 8, BITS, dtype=np.uint8)
 
-        ori_shape = img.shape
-        max_bytes = ori_shape[0] * ori_shape[1] // BYTES_PER_BYTE
-        msg = '{}{}{}'.format(len(msg), FLAG, msg)
 
-        if len(msg) > max_bytes:
-            raise ValueError(f"Message too large. Max capacity: {max_bytes} characters.")
+def pack_groups(payload):
+    # every byte becomes BYTES_PER_BYTE groups of BITS bits, lowest group first
+    data = np.frombuffer(payload, dtype=np.uint8)
+    return ((data[:, None] >> SHIFTS) & LOW_BITS).reshape(-1)
+
+def unpack_groups(groups):
+    groups = (groups & LOW_BITS).reshape(-1, BYTES_PER_BYTE)
+    return np.bitwise_or.reduce(groups << SHIFTS, axis=1).astype(np.uint8).tobytes()
+
+def capacity(shape):
+    return shape[0] * shape[1] // BYTES_PER_BYTE
 
-        data = np.reshape(img, -1)
-        for idx, val in enumerate(msg):
-            encode(data[idx * BYTES_PER_BYTE: (idx + 1) * BYTES_PER_BYTE], val)
+def frame(payload):
+    payload = to_bytes(payload)
+    return '{}{}'.format(len(payload), FLAG).encode() + payload
 
-        img = np.reshape(data, ori_shape)
+def embed_payload(data, payload):
+    groups = pack_groups(frame(payload))
+    if groups.size > len(data):
+        raise ValueError(f"Message too large. Max capacity: {len(data) // BYTES_PER_BYTE} bytes.")
+    data[:groups.size] = (data[:groups.size] & HIGH_BITS) | groups
+
+def read_bytes(data, offset, count):
+    return unpack_groups(data[offset * BYTES_PER_BYTE: (offset + count) * BYTES_PER_BYTE])
+
+def extract_payload(data):
+    capacity = len(data) // BYTES_PER_BYTE
+    header = read_bytes(data, 0, min(len(str(capacity)) + 1, capacity))
+    end = header.find(FLAG.encode())
+    if end <= 0:
+        raise ValueError("No embedded message found.")
+    length = int(header[:end])
+    if end + 1 + length > capacity:
+        raise ValueError("Embedded length exceeds image capacity.")
+    return read_bytes(data, end + 1, length)
+
+def insert(img_path, msg):
+    try:
+        payload = to_bytes(msg)
         filename, ext = path.splitext(img_path)
         filename += '_lsb_embedded' + ext
-        cv2.imwrite(filename, img)
+        layout = carrier.read_layout(img_path)
+        if layout is not None:
+            ori_shape = (layout.height, layout.width)
+        else:
+            img = cv2.imread(img_path, cv2.IMREAD_ANYCOLOR)
+            if img is None:
+                raise FileNotFoundError("Image not found. Check the file path.")
+            ori_shape = img.shape
+
+        max_bytes = capacity(ori_shape)
+        if len(frame(payload)) > max_bytes:
+            raise ValueError(f"Message too large. Max capacity: {max_bytes} characters.")
+
+        if layout is not None:
+            # uncompressed carrier: clone the file (a full copy without reflink support)
+            # and patch only the bytes the payload touches, no decode or encode
+            pixels = carrier.open_pixels(img_path, output=filename)
+            embed_payload(pixels, payload)
+            pixels.flush()
+        else:
+            data = np.reshape(img, -1)
+            embed_payload(data, payload)
+            img = np.reshape(data, ori_shape)
+            cv2.imwrite(filename, img)
         print(f"Successfully embedded message into {filename}")
         return filename
     except Exception as e:
         print(f"Error: {e}")
 
-def encode(block, data):
-    data = ord(data)
-    for idx in range(len(block)):
-        block[idx] &= HIGH_BITS
-        block[idx] |= (data >> (BITS * idx)) & LOW_BITS
-
-def extract(img_path):
+def extract(img_path, as_bytes=False):
     try:
-        img = cv2.imread(img_path, cv2.IMREAD_ANYCOLOR)
-        if img is None:
-            raise FileNotFoundError("Image not found. Check the file path.")
-
-        data = np.reshape(img, -1)
-        message = ""
-        idx = 0
-        while True:
-            char_code = 0
-            for i in range(BYTES_PER_BYTE):
-                char_code |= (data[idx] & LOW_BITS) << (BITS * i)
-                idx += 1
-            char = chr(char_code)
-            if char == FLAG:
-                break
-            message += char
-
-        length = int(message)
-        extracted_msg = ""
-        for _ in range(length):
-            char_code = 0
-            for i in range(BYTES_PER_BYTE):
-                char_code |= (data[idx] & LOW_BITS) << (BITS * i)
-                idx += 1
-            extracted_msg += chr(char_code)
+        if carrier.is_mappable(img_path):
+            data = carrier.open_pixels(img_path)
+        else:
+            img = cv2.imread(img_path, cv2.IMREAD_ANYCOLOR)
+            if img is None:
+                raise FileNotFoundError("Image not found. Check the file path.")
+            data = np.reshape(img, -1)
+
+        payload = extract_payload(data)
+        extracted_msg = payload if as_bytes else to_text(payload)
 
         print("Extracted message:", extracted_msg)
         return extracted_msg
@@ -2,9 +2,12 @@ import sys
 import math
 import os
 from os import path
+import hashlib
 import cv2
 import numpy as np
-import random
+import carrier
+from codec import to_bytes, to_text
+from lab2 import pack_groups, unpack_groups, frame, capacity
 
 
 BITS = 2
@@ -12,6 +15,7 @@ HIGH_BITS = 256 - (1 << BITS)
 LOW_BITS = (1 << BITS) - 1
 BYTES_PER_BYTE = math.ceil(8 / BITS)
 FLAG = '%'
+FEISTEL_ROUNDS = 4
 
 
 def list_images(directory):
@@ -35,84 +39,123 @@ def list_images(directory):
             print("Please enter a valid number.")
 
 
-def generate_permutation(size, seed):
-    indices = list(range(size))
-    random.seed(seed)
-    random.shuffle(indices)
-    return indices
+def feistel_keys(seed, rounds=FEISTEL_ROUNDS):
+    digest = hashlib.blake2b(str(seed).encode(), digest_size=8 * rounds).digest()
+    return np.frombuffer(digest, dtype='<u8')
 
 
-def insert(img_path, msg):
-    try:
-        seed = int(input("Enter integer key for permutation (seed): "))
-        img = cv2.imread(img_path, cv2.IMREAD_ANYCOLOR)
-        if img is None:
-            raise FileNotFoundError("Image not found. Check the file path.")
+def feistel(values, half_bits, keys):
+    mask = np.uint64((1 << half_bits) - 1)
+    left, right = values >> np.uint64(half_bits), values & mask
+    for key in keys:
+        mixed = (right ^ key) * np.uint64(0x9E3779B97F4A7C15)
+        mixed ^= mixed >> np.uint64(29)
+        mixed *= np.uint64(0xBF58476D1CE4E5B9)
+        mixed ^= mixed >> np.uint64(32)
+        left, right = right, left ^ (mixed & mask)
+    return (left << np.uint64(half_bits)) | right
 
-        ori_shape = img.shape
-        max_bytes = ori_shape[0] * ori_shape[1] // BYTES_PER_BYTE
-        msg = '{}{}{}'.format(len(msg), FLAG, msg)
 
-        if len(msg) > max_bytes:
-            raise ValueError(f"Message too large. Max capacity: {max_bytes} characters.")
+def generate_permutation(size, seed, start=0, count=None):
+    # keyed bijection over [0, size): a Feistel network on the smallest even bit
+    # width covering size, cycle-walked back into range; only positions
+    # start..start+count are evaluated
+    if count is None:
+        count = size - start
+    if start < 0 or start + count > size:
+        raise ValueError("Permutation range out of bounds.")
+    half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+    keys = feistel_keys(seed)
+
+    slots = feistel(np.arange(start, start + count, dtype=np.uint64), half_bits, keys)
+    pending = slots >= size
+    while pending.any():
+        slots[pending] = feistel(slots[pending], half_bits, keys)
+        pending = slots >= size
+    return slots.astype(np.int64)
+
+
+def slot_indices(slots):
+    return (slots[:, None] * BYTES_PER_BYTE + np.arange(BYTES_PER_BYTE)).reshape(-1)
+
+
+def embed_payload(data, payload, seed):
+    framed = frame(payload)
+    total_slots = len(data) // BYTES_PER_BYTE
+    if len(framed) > total_slots:
+        raise ValueError(f"Message too large. Max capacity: {total_slots} bytes.")
+    idx = slot_indices(generate_permutation(total_slots, seed, 0, len(framed)))
+    data[idx] = (data[idx] & HIGH_BITS) | pack_groups(framed)
+
+
+def read_bytes(data, seed, total_slots, offset, count):
+    idx = slot_indices(generate_permutation(total_slots, seed, offset, count))
+    return unpack_groups(data[idx])
+
 
-        data = np.reshape(img, -1)
-        total_slots = len(data) // BYTES_PER_BYTE
-        perm = generate_permutation(total_slots, seed)
+def extract_payload(data, seed):
+    total_slots = len(data) // BYTES_PER_BYTE
+    header = read_bytes(data, seed, total_slots, 0, min(len(str(total_slots)) + 1, total_slots))
+    end = header.find(FLAG.encode())
+    if end <= 0:
+        raise ValueError("No embedded message found.")
+    length = int(header[:end])
+    if end + 1 + length > total_slots:
+        raise ValueError("Embedded length exceeds image capacity.")
+    return read_bytes(data, seed, total_slots, end + 1, length)
 
-        for real_idx, val in zip(perm, msg):
-            encode(data[real_idx * BYTES_PER_BYTE: (real_idx + 1) * BYTES_PER_BYTE], val)
 
-        img = np.reshape(data, ori_shape)
+def insert(img_path, msg, seed=None):
+    try:
+        if seed is None:
+            seed = int(input("Enter integer key for permutation (seed): "))
+        payload = to_bytes(msg)
         filename, ext = path.splitext(img_path)
         filename += '_lsb_embedded' + ext
-        cv2.imwrite(filename, img)
+        layout = carrier.read_layout(img_path)
+        if layout is not None:
+            ori_shape = (layout.height, layout.width)
+        else:
+            img = cv2.imread(img_path, cv2.IMREAD_ANYCOLOR)
+            if img is None:
+                raise FileNotFoundError("Image not found. Check the file path.")
+            ori_shape = img.shape
+
+        max_bytes = capacity(ori_shape)
+        if len(frame(payload)) > max_bytes:
+            raise ValueError(f"Message too large. Max capacity: {max_bytes} characters.")
+
+        if layout is not None:
+            # uncompressed carrier: clone the file (a full copy without reflink support)
+            # and patch only the bytes the payload touches, no decode or encode
+            pixels = carrier.open_pixels(img_path, output=filename)
+            embed_payload(pixels, payload, seed)
+            pixels.flush()
+        else:
+            data = np.reshape(img, -1)
+            embed_payload(data, payload, seed)
+            img = np.reshape(data, ori_shape)
+            cv2.imwrite(filename, img)
         print(f"Successfully embedded message into {filename}")
         return filename
     except Exception as e:
         print(f"Error: {e}")
 
 
-def encode(block, data):
-    data = ord(data)
-    for idx in range(len(block)):
-        block[idx] &= HIGH_BITS
-        block[idx] |= (data >> (BITS * idx)) & LOW_BITS
-
-
-def extract(img_path):
+def extract(img_path, as_bytes=False, seed=None):
     try:
-        seed = int(input("Enter integer key for permutation (seed): "))
-        img = cv2.imread(img_path, cv2.IMREAD_ANYCOLOR)
-        if img is None:
-            raise FileNotFoundError("Image not found. Check the file path.")
-
-        data = np.reshape(img, -1)
-        total_slots = len(data) // BYTES_PER_BYTE
-        perm = generate_permutation(total_slots, seed)
-
-        message = ""
-        idx = 0
-        while True:
-            real_idx = perm[idx]
-            char_code = 0
-            for i in range(BYTES_PER_BYTE):
-                char_code |= (data[real_idx * BYTES_PER_BYTE + i] & LOW_BITS) << (BITS * i)
-            idx += 1
-            char = chr(char_code)
-            if char == FLAG:
-                break
-            message += char
-
-        length = int(message)
-        extracted_msg = ""
-        for _ in range(length):
-            real_idx = perm[idx]
-            char_code = 0
-            for i in range(BYTES_PER_BYTE):
-                char_code |= (data[real_idx * BYTES_PER_BYTE + i] & LOW_BITS) << (BITS * i)
-            idx += 1
-            extracted_msg += chr(char_code)
+        if seed is None:
+            seed = int(input("Enter integer key for permutation (seed): "))
+        if carrier.is_mappable(img_path):
+            data = carrier.open_pixels(img_path)
+        else:
+            img = cv2.imread(img_path, cv2.IMREAD_ANYCOLOR)
+            if img is None:
+                raise FileNotFoundError("Image not found. Check the file path.")
+            data = np.reshape(img, -1)
+
+        payload = extract_payload(data, seed)
+        extracted_msg = payload if as_bytes else to_text(payload)
 
         print("Extracted message:", extracted_msg)
         return extracted_msg
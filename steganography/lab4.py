@@ -1,76 +1,73 @@
 import cv2
 import numpy as np
-import random
+import secrets
+from codec import to_bytes, to_bits, from_bits, to_text
+from lab3 import generate_permutation
 
-def text_to_bits(text):
-    return ''.join(f'{ord(c):08b}' for c in text)
+def generate_coords(h, w, num_bits, r, key):
+    # keyed permutation of the interior pixels: every (bit, repetition) pair gets
+    # its own pixel and the coordinates can be rebuilt from the key alone
+    slots = generate_permutation((h - 2) * (w - 2), key, 0, num_bits * r)
+    ys, xs = np.divmod(slots, w - 2)
+    return np.stack((ys + 1, xs + 1), axis=-1).reshape(num_bits, r, 2)
 
-def bits_to_text(bits):
-    chars = [chr(int(bits[i:i+8], 2)) for i in range(0, len(bits), 8)]
-    return ''.join(chars)
-
-def generate_coords(h, w, num_bits, r):
-    coords = []
-    for _ in range(num_bits):
-        bit_coords = []
-        for _ in range(r):
-            y = random.randint(1, h - 2)
-            x = random.randint(1, w - 2)
-            bit_coords.append((y, x))
-        coords.append(bit_coords)
-    return coords
-
-def embed_message(image_path, message, output_path, alpha=0.07, r=9):
+def embed_message(image_path, message, output_path, alpha=0.07, r=9, key=None):
     img = cv2.imread(image_path)
     if img is None:
         raise FileNotFoundError("Image not found.")
     h, w, _ = img.shape
-    bits = text_to_bits(message)
+    payload = to_bytes(message)
+    bits = to_bits(payload)
     total_bits = len(bits)
     max_bits = (h - 2) * (w - 2) // r
     if total_bits > max_bits:
         raise ValueError("Message too long for this image.")
+    if key is None:
+        # a fresh key is returned with the coordinates, the receiver needs one or the other
+        key = secrets.randbits(64)
 
     img = img.astype(np.float32)
     Y = 0.298 * img[:, :, 2] + 0.586 * img[:, :, 1] + 0.114 * img[:, :, 0]
-    coords = generate_coords(h, w, total_bits, r)
+    coords = generate_coords(h, w, total_bits, r, key)
+    ys, xs = coords[..., 0], coords[..., 1]
 
-    for i, bit in enumerate(bits):
-        for y, x in coords[i]:
-            delta = alpha * Y[y, x]
-            if bit == '1':
-                img[y, x, 0] = np.clip(img[y, x, 0] + delta, 0, 255)
-            else:
-                img[y, x, 0] = np.clip(img[y, x, 0] - delta, 0, 255)
+    delta = alpha * Y[ys, xs]
+    sign = np.where(bits, 1, -1)[:, None]
+    img[ys, xs, 0] = np.clip(img[ys, xs, 0] + sign * delta, 0, 255)
 
     cv2.imwrite(output_path, img.astype(np.uint8))
     print("Message embedded and saved to", output_path)
-    return coords, len(message)
+    return coords, len(payload), key
 
-def extract_message(image_path, coords, msg_len, r=9):
+def extract_payload(image_path, coords, msg_len, r=9, key=None):
     img = cv2.imread(image_path)
     if img is None:
         raise FileNotFoundError("Image not found.")
     img = img.astype(np.float32)
     B = img[:, :, 0]
 
-    bits = []
-    for i in range(msg_len * 8):
-        votes = []
-        for y, x in coords[i]:
-            neighbors = [B[y-1, x], B[y+1, x], B[y, x-1], B[y, x+1]]
-            pred = np.mean(neighbors)
-            delta = B[y, x] - pred
-            bit = 1 if delta > 0 else 0
-            votes.append(bit)
-        majority = 1 if votes.count(1) > votes.count(0) else 0
-        bits.append(str(majority))
+    if coords is None:
+        if key is None:
+            raise ValueError("Either coords or key is required.")
+        coords = generate_coords(B.shape[0], B.shape[1], msg_len * 8, r, key)
+    coords = np.asarray(coords)[:msg_len * 8]
+    ys, xs = coords[..., 0], coords[..., 1]
+
+    # cross-shaped neighbour prediction and majority vote, for all bits at once
+    pred = (B[ys - 1, xs] + B[ys + 1, xs] + B[ys, xs - 1] + B[ys, xs + 1]) / 4
+    votes = (B[ys, xs] - pred) > 0
+    bits = 2 * votes.sum(axis=1) > votes.shape[1]
+
+    return from_bits(bits)
 
-    return bits_to_text(''.join(bits))
+def extract_message(image_path, coords, msg_len, r=9, key=None):
+    return to_text(extract_payload(image_path, coords, msg_len, r, key))
 
 # Przykład użycia
 if __name__ == "__main__":
     message = "Jestem Pawel"
-    coords, length = embed_message('assets/images.bmp', message, 'assets/output_kjb.bmp')
+    key = 2024
+    coords, length, key = embed_message('assets/images.bmp', message, 'assets/output_kjb.bmp', key=key)
     recovered = extract_message('assets/output_kjb.bmp', coords, length)
     print("Recovered:", recovered)
+    print("Recovered from key:", extract_message('assets/output_kjb.bmp', None, length, key=key))
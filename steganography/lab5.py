@@ -1,6 +1,7 @@
 import numpy as np
 import cv2
 from scipy.fftpack import dct, idct
+from codec import HEADER_BITS, to_bits, from_bits, to_text, frame, frame_length, unframe
 
 def preprocess_image(image_path):
     img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
@@ -11,64 +12,59 @@ def preprocess_image(image_path):
     return img
 
 def split_into_blocks(img):
-    blocks = []
+    # (H/8, W/8, 8, 8) strided view, no data is copied
     height, width = img.shape
-    for i in range(0, height, 8):
-        for j in range(0, width, 8):
-            blocks.append(img[i:i+8, j:j+8].astype(np.float32))
-    return blocks
+    return img.reshape(height // 8, 8, width // 8, 8).swapaxes(1, 2)
 
-def merge_blocks(blocks, image_shape):
+def block_count(image_shape):
     height, width = image_shape
-    img = np.zeros((height, width), dtype=np.float32)
-    idx = 0
-    for i in range(0, height, 8):
-        for j in range(0, width, 8):
-            img[i:i+8, j:j+8] = blocks[idx]
-            idx += 1
-    return img
+    return (height // 8) * (width // 8)
+
+def block_coords(blocks, start, count):
+    # row-major block order, same as iterating the image left to right, top to bottom
+    return np.divmod(np.arange(start, start + count), blocks.shape[1])
+
+def dct2(blocks):
+    return dct(dct(blocks, axis=-1, norm='ortho'), axis=-2, norm='ortho')
 
-def embed_data(blocks, message_bits, alpha=100):
-    embedded_blocks = []
-    for idx, block in enumerate(blocks):
-        dct_block = dct(dct(block.T, norm='ortho').T, norm='ortho')
-        if idx < len(message_bits):
-            x, y = 3, 4
-            if message_bits[idx] == '1':
-                dct_block[x, y] = dct_block[y, x] + alpha
-            else:
-                dct_block[x, y] = dct_block[y, x] - alpha
-        idct_block = idct(idct(dct_block.T, norm='ortho').T, norm='ortho')
-        embedded_blocks.append(idct_block)
-    return embedded_blocks
-
-def extract_data(blocks, bit_count):
-    extracted_bits = ''
-    for idx, block in enumerate(blocks):
-        if idx >= bit_count:
-            break
-        dct_block = dct(dct(block.T, norm='ortho').T, norm='ortho')
-        x, y = 3, 4
-        extracted_bits += '1' if dct_block[x, y] > dct_block[y, x] else '0'
-    return extracted_bits
-
-def message_to_bits(message):
-    return ''.join(f'{ord(c):08b}' for c in message)
-
-def bits_to_message(bits):
-    chars = []
-    for i in range(0, len(bits), 8):
-        byte = bits[i:i+8]
-        if len(byte) < 8:
-            break
-        chars.append(chr(int(byte, 2)))
-    return ''.join(chars)
-
-def int_to_bits(n, bit_len=16):
-    return f'{n:0{bit_len}b}'
-
-def bits_to_int(bits):
-    return int(bits, 2)
+def idct2(blocks):
+    return idct(idct(blocks, axis=-1, norm='ortho'), axis=-2, norm='ortho')
+
+def embed_data(img, message_bits, alpha=100):
+    bits = np.asarray(message_bits, dtype=bool)
+    embedded = img.astype(np.float32)
+    blocks = split_into_blocks(embedded)
+    if bits.size > block_count(img.shape):
+        raise ValueError("Image too small to hold the message.")
+
+    rows, cols = block_coords(blocks, 0, bits.size)
+    dct_blocks = dct2(blocks[rows, cols])
+    x, y = 3, 4
+    dct_blocks[:, x, y] = dct_blocks[:, y, x] + np.where(bits, alpha, -alpha)
+    blocks[rows, cols] = idct2(dct_blocks)
+    return embedded
+
+def extract_data(img, bit_count, offset=0):
+    blocks = split_into_blocks(img)
+    rows, cols = block_coords(blocks, offset, bit_count)
+    dct_blocks = dct2(blocks[rows, cols].astype(np.float32))
+    x, y = 3, 4
+    bits = dct_blocks[:, x, y] > dct_blocks[:, y, x]
+    return bits.astype(np.uint8)
+
+def embed_message(img, message, alpha=100, crc=True):
+    bits = to_bits(frame(message, crc=crc))
+    if bits.size > block_count(img.shape):
+        raise ValueError("Image too small to hold the message.")
+    return embed_data(img, bits, alpha=alpha)
+
+def extract_message(img):
+    header = from_bits(extract_data(img, HEADER_BITS))
+    bit_count = frame_length(header) * 8
+    if bit_count > block_count(img.shape):
+        raise ValueError("Embedded length exceeds image capacity.")
+    payload_bits = extract_data(img, bit_count - HEADER_BITS, offset=HEADER_BITS)
+    return unframe(header + from_bits(payload_bits))
 
 if __name__ == "__main__":
     image_path = './assets/images.jpg'              # oryginał może być JPEG
@@ -76,29 +72,17 @@ if __name__ == "__main__":
     message = "Hello!"
 
     img = preprocess_image(image_path)
-    blocks = split_into_blocks(img)
-
-    message_bits = message_to_bits(message)
-    message_length_bits = int_to_bits(len(message_bits), bit_len=16)
-    full_bits = message_length_bits + message_bits
-
-    if len(full_bits) > len(blocks):
-        raise ValueError("Image too small to hold the message.")
-
-    embedded_blocks = embed_data(blocks, full_bits, alpha=100)
-    embedded_img = merge_blocks(embedded_blocks, img.shape)
+    embedded_img = embed_message(img, message, alpha=100)
 
     embedded_img_clipped = np.clip(embedded_img, 0, 255).astype(np.uint8)
     cv2.imwrite(output_path, embedded_img_clipped)
 
     extracted_img = cv2.imread(output_path, cv2.IMREAD_GRAYSCALE)
-    extracted_blocks = split_into_blocks(extracted_img)
-
-    length_bits = extract_data(extracted_blocks, 16)
-    message_bit_length = bits_to_int(length_bits)
-
-    extracted_bits = extract_data(extracted_blocks[16:], message_bit_length)
-    extracted_message = bits_to_message(extracted_bits)
+    try:
+        extracted_message = to_text(extract_message(extracted_img))
+    except ValueError as e:
+        extracted_message = None
+        print("Extraction failed:", e)
 
     print("Original message:", message)
     print("Extracted message:", extracted_message)
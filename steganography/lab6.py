@@ -1,48 +1,68 @@
 import numpy as np
 import wave
+from codec import to_bytes, to_bits, to_text
 
-def text_to_bits(text):
-    return ''.join(f'{ord(c):08b}' for c in text)
+CHUNK_FRAMES = 65536
+FIRST_CHUNK_FRAMES = 1024
 
-def bits_to_text(bits):
-    chars = [chr(int(bits[i:i+8], 2)) for i in range(0, len(bits), 8)]
-    return ''.join(chars)
+def lsb_bytes(samples, sample_width):
+    # WAV samples are little-endian, so the least significant byte of every
+    # sample (any width, any channel) sits at a multiple of sample_width
+    return samples[::sample_width]
+
+def hide_message_lsb(input_wav, output_wav, message, chunk_frames=CHUNK_FRAMES):
+    bits = to_bits(b''.join((to_bytes(message), b'\0')))  # terminator (null char)
 
-def hide_message_lsb(input_wav, output_wav, message):
     with wave.open(input_wav, 'rb') as wav_in:
         params = wav_in.getparams()
-        n_frames = wav_in.getnframes()
-        audio_data = np.frombuffer(wav_in.readframes(n_frames), dtype=np.int16)
-
-    bits = text_to_bits(message)
-    bits += '00000000'  # terminator (null char)
-
-    if len(bits) > len(audio_data):
-        raise ValueError("Message too long to hide in this audio")
+        if len(bits) > params.nframes * params.nchannels:
+            raise ValueError("Message too long to hide in this audio")
 
-    modified = np.copy(audio_data)
-    for i, bit in enumerate(bits):
-        modified[i] = (modified[i] & ~1) | int(bit)
+        with wave.open(output_wav, 'wb') as wav_out:
+            wav_out.setparams(params)
+            pos = 0
+            while True:
+                frames = wav_in.readframes(chunk_frames)
+                if not frames:
+                    break
+                # only chunks that still hold payload bits are decoded, the rest is copied as-is
+                if pos < len(bits):
+                    samples = np.frombuffer(frames, dtype=np.uint8).copy()
+                    low = lsb_bytes(samples, params.sampwidth)
+                    n = min(len(bits) - pos, len(low))
+                    low[:n] = (low[:n] & 0xFE) | bits[pos:pos + n]
+                    pos += n
+                    frames = samples.tobytes()
+                wav_out.writeframesraw(frames)
 
-    with wave.open(output_wav, 'wb') as wav_out:
-        wav_out.setparams(params)
-        wav_out.writeframes(modified.tobytes())
-
-def extract_message_lsb(stego_wav):
+def extract_payload_lsb(stego_wav, chunk_frames=CHUNK_FRAMES):
+    message = []
+    pending = np.empty(0, dtype=np.uint8)
+    # start small and grow, so short messages only touch the beginning of the file
+    size = min(FIRST_CHUNK_FRAMES, chunk_frames)
     with wave.open(stego_wav, 'rb') as wav_in:
-        n_frames = wav_in.getnframes()
-        audio_data = np.frombuffer(wav_in.readframes(n_frames), dtype=np.int16)
-
-    bits = ''.join([str(sample & 1) for sample in audio_data])
-    bytes_list = [bits[i:i+8] for i in range(0, len(bits), 8)]
-    chars = []
+        sample_width = wav_in.getsampwidth()
+        while True:
+            frames = wav_in.readframes(size)
+            size = min(size * 2, chunk_frames)
+            if not frames:
+                break
+            bits = lsb_bytes(np.frombuffer(frames, dtype=np.uint8), sample_width) & 1
+            if pending.size:
+                bits = np.concatenate((pending, bits))
+            usable = bits.size - bits.size % 8
+            data = np.packbits(bits[:usable])
+            terminator = np.flatnonzero(data == 0)
+            if terminator.size:
+                message.append(data[:terminator[0]].tobytes())
+                break
+            message.append(data.tobytes())
+            pending = bits[usable:]
 
-    for byte in bytes_list:
-        if byte == '00000000':
-            break
-        chars.append(chr(int(byte, 2)))
+    return b''.join(message)
 
-    return ''.join(chars)
+def extract_message_lsb(stego_wav, chunk_frames=CHUNK_FRAMES):
+    return to_text(extract_payload_lsb(stego_wav, chunk_frames))
 
 # Przykład użycia
 if __name__ == '__main__':